@@ -1,7 +1,11 @@
 import streamlit as st
 from styles.custom_css import get_custom_css
-from utils.session_manager import init_session_state
-from utils.model_persistence import ModelPersistence
+from utils.session_manager import init_session_state, get_training_job_manager, sync_training_jobs
+from utils.model_persistence import ModelPersistence, MODEL_PRELOAD
+from utils.model_cache import get_shared_model_cache
+from ml.feature_store import FeatureStore
+from ml.model_registry import get_model_names
+from ml.training_jobs import ACTIVE_STATUSES
 from pages import home, model, analysis, comparison, about, saved_models
 
 # Konfigurasi halaman
@@ -20,7 +24,11 @@ init_session_state()
 
 # Initialize model persistence
 if "model_persistence" not in st.session_state:
-    st.session_state.model_persistence = ModelPersistence()
+    st.session_state.model_persistence = ModelPersistence(model_cache=get_shared_model_cache())
+
+# Initialize feature store (cache fitur di disk)
+if "feature_store" not in st.session_state:
+    st.session_state.feature_store = FeatureStore()
 
 # Auto-load saved models on first run
 if "models_loaded" not in st.session_state:
@@ -28,7 +36,42 @@ if "models_loaded" not in st.session_state:
         loaded, total = st.session_state.model_persistence.load_all_models()
         if loaded > 0:
             st.success(f"✅ {loaded} model(s) berhasil dimuat dari disk!")
-        st.session_state.models_loaded = True
+    
+    if MODEL_PRELOAD and loaded > 0:
+        progress = st.progress(0.0, text="Memuat object model...")
+        report = st.session_state.model_persistence.preload_models(
+            st.session_state.trained_models,
+            progress_callback=lambda done, n, name, error: progress.progress(done / n, text=f"Memuat {name} ({done}/{n})")
+        )
+        progress.empty()
+        for name, error in report['failed'].items():
+            st.warning(f"⚠️ Model '{name}' gagal dimuat: {error}")
+    st.session_state.models_loaded = True
+
+# Hasil job training background yang selesai sejak rerun terakhir
+for job in sync_training_jobs():
+    if job['status'] == 'done':
+        st.toast(f"✅ Training {job['save_name']} selesai")
+    elif job['status'] == 'failed':
+        st.toast(f"❌ Training {job['save_name']} gagal: {job.get('error', '')}")
+    st.session_state.last_training_job = job
+
+def validation_split_param(key_prefix):
+    """Slider fraksi data training untuk validasi (early stopping booster, EarlyStopping LSTM)"""
+    return st.slider("Validation Split (%)", 10, 30, 20, step=5, key=f"{key_prefix}_val_split") / 100
+
+def early_stopping_params(key_prefix):
+    """Kontrol early stopping sidebar untuk model booster (XGBoost, CatBoost)"""
+    enabled = st.checkbox(
+        "Early Stopping",
+        value=False,
+        key=f"{key_prefix}_early_stopping",
+        help="Sebagian data training dipakai sebagai validasi. Training berhenti saat error validasi tidak membaik, lalu model dipotong ke iterasi terbaik."
+    )
+    if not enabled:
+        return {}
+    rounds = st.slider("Early Stopping Rounds", 5, 100, 20, key=f"{key_prefix}_es_rounds")
+    return {"early_stopping_rounds": rounds, "validation_split": validation_split_param(key_prefix)}
 
 # Sidebar - Model Selection
 with st.sidebar:
@@ -37,16 +80,7 @@ with st.sidebar:
 
     ml_model = st.selectbox(
         "Pilih Model ML:",
-        [
-            "Dummy Regressor",
-            "Linear Regression",
-            "Decision Tree",
-            "Random Forest",
-            "XGBoost",
-            "CatBoost",
-            "SVR",
-            "LSTM"
-        ],
+        get_model_names(),
         key="ml_model_select"
     )
 
@@ -119,6 +153,7 @@ with st.sidebar:
             "max_depth": max_depth,
             "random_state": 42
         }
+        st.session_state.model_params.update(early_stopping_params("xgb"))
 
     elif ml_model == "CatBoost":
         n_estimators = st.slider("N Estimators", 50, 500, 200, key="cb_n_estimators")
@@ -130,6 +165,7 @@ with st.sidebar:
             "learning_rate": learning_rate,
             "random_seed": 42
         }
+        st.session_state.model_params.update(early_stopping_params("cb"))
 
     elif ml_model == "SVR":
         kernel = st.selectbox("Kernel", ["linear", "poly", "rbf", "sigmoid"], key="svr_kernel")
@@ -146,12 +182,32 @@ with st.sidebar:
         batch_size = st.slider("Batch Size", 8, 128, 32, key="lstm_batch")
         st.session_state.model_params = {
             "epochs": epochs,
-            "batch_size": batch_size
+            "batch_size": batch_size,
+            "validation_split": validation_split_param("lstm")
         }
 
+    # Parameter terakhir per model, dipakai mode "Train All Models"
+    if "model_params_by_model" not in st.session_state:
+        st.session_state.model_params_by_model = {}
+    st.session_state.model_params_by_model[ml_model] = st.session_state.model_params
+
     st.markdown("---")
     st.caption("📌 Model yang dipilih: **" + ml_model + "**")
 
+    # Status job training sesi ini, di-polling selama masih ada job berjalan
+    @st.fragment(run_every=2 if st.session_state.training_jobs else None)
+    def training_job_status():
+        jobs = [get_training_job_manager().get(job_id) for job_id in st.session_state.training_jobs]
+        if any(job is None or job['status'] not in ACTIVE_STATUSES for job in jobs):
+            # Ada job selesai: rerun seluruh app agar modelnya masuk ke sesi
+            st.rerun()
+        for job in jobs:
+            progress = job.get('progress') or {}
+            detail = f" ({progress['iteration']}/{progress.get('total') or '?'})" if progress.get('iteration') else ""
+            st.caption(f"⏳ {job['save_name']}: {job['stage']}{detail}")
+
+    training_job_status()
+
 # ==========================================================
 # Navigation Bar
 # ==========================================================
@@ -0,0 +1,83 @@
+"""
+Benchmark input LSTM: WindowSequence (window per batch) vs loop + np.array lama.
+
+WindowSequence dipakai langsung seperti saat training (shuffle=False agar
+urutan batch bisa dibandingkan), semua batch diiterasi satu epoch.
+
+Jalankan dari root project:
+    python benchmarks/bench_create_sequences.py --rows 200000 --window 10
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml.sequence_data import WindowSequence
+
+
+def legacy_create_sequences(X, y, window_size):
+    """Implementasi loop lama"""
+    Xs, ys = [], []
+    for i in range(window_size, len(X)):
+        Xs.append(X[i - window_size:i])
+        ys.append(y[i])
+    return np.array(Xs), np.array(ys)
+
+
+def iterate_epoch(X, y, window_size, batch_size):
+    """Satu epoch WindowSequence: buat sequence lalu ambil semua batch (seperti model.fit)"""
+    sequence = WindowSequence(X, y, window_size=window_size, batch_size=batch_size, workers=1)
+    n_batches = 0
+    for idx in range(len(sequence)):
+        sequence[idx]
+        n_batches += 1
+    return sequence, n_batches
+
+
+def measure(fn, *args):
+    """Jalankan fn, kembalikan (hasil, detik, peak MB)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--features', type=int, default=272)
+    parser.add_argument('--window', type=int, default=10)
+    parser.add_argument('--batch-size', type=int, default=32)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    # float32 seperti hasil konversi di WindowSequence, agar isi batch bisa dibandingkan persis
+    X = rng.random((args.rows, args.features), dtype=np.float32)
+    y = rng.random((args.rows, 1), dtype=np.float32)
+
+    (sequence, n_batches), t_new, m_new = measure(iterate_epoch, X, y, args.window, args.batch_size)
+    (X_old, y_old), t_old, m_old = measure(legacy_create_sequences, X, y, args.window)
+
+    for idx in range(len(sequence)):
+        X_batch, y_batch = sequence[idx]
+        start = idx * args.batch_size
+        assert np.array_equal(X_batch, X_old[start:start + len(X_batch)])
+        assert np.array_equal(y_batch, y_old[start:start + len(y_batch)])
+    assert n_batches * args.batch_size >= len(X_old)
+
+    print(f"Input: {X.nbytes / 1e6:.1f} MB | window: {X_old.shape} | {n_batches} batch x {args.batch_size}")
+    print(f"WindowSequence (1 epoch): {t_new * 1000:.2f} ms, peak {m_new:.1f} MB")
+    print(f"Legacy loop             : {t_old * 1000:.2f} ms, peak {m_old:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark waktu cold-start import ml.model_trainer.
+
+Membandingkan import lazy (library model di-import saat dipakai) dengan
+import semua library model di awal (perilaku lama). Setiap pengukuran
+dijalankan di proses Python baru.
+
+Jalankan dari root project:
+    python benchmarks/bench_import_time.py --runs 3
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LAZY = "import ml.model_trainer"
+EAGER = (
+    "import ml.model_trainer\n"
+    "from ml.model_registry import MODEL_REGISTRY\n"
+    "import importlib\n"
+    "for spec in MODEL_REGISTRY.values(): importlib.import_module(spec.module)\n"
+    "import sklearn.metrics, sklearn.model_selection, sklearn.preprocessing\n"
+    "import keras.models, keras.layers, keras.callbacks"
+)
+
+
+def time_import(code):
+    """Waktu eksekusi code di proses baru (detik)"""
+    script = (
+        "import time\n"
+        "start = time.perf_counter()\n"
+        f"{code}\n"
+        "print(time.perf_counter() - start)\n"
+    )
+    env = dict(os.environ, TF_CPP_MIN_LOG_LEVEL="3")
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=ROOT, env=env,
+        capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    lazy = [time_import(LAZY) for _ in range(args.runs)]
+    eager = [time_import(EAGER) for _ in range(args.runs)]
+
+    print(f"Lazy  import ml.model_trainer : {statistics.median(lazy):.3f} s (median {args.runs} run)")
+    print(f"Eager import semua library    : {statistics.median(eager):.3f} s (median {args.runs} run)")
+    print(f"Cold-start dihemat            : {statistics.median(eager) - statistics.median(lazy):.3f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Cek memori predictions yang dimuat dari disk (y_test bersama per split, memory-map).
+
+Menyimpan beberapa model pada split yang sama, memuat ulang predictions-nya,
+lalu memastikan y_test tetap np.memmap (tidak disalin ke heap) dan satu
+object dipakai bersama oleh semua model.
+
+Jalankan dari root project:
+    python benchmarks/bench_prediction_memory.py --models 8 --rows 1000000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sklearn.dummy import DummyRegressor
+from utils.model_persistence import ModelPersistence
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--models', type=int, default=8)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    y_test = rng.random(args.rows)
+    metrics = {'MAE': 0.0, 'MSE': 0.0, 'RMSE': 0.0, 'MAPE': 0.0, 'R2': 1.0}
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        persistence = ModelPersistence(base_dir=base_dir)
+        names = [f"model_{i}" for i in range(args.models)]
+        for name in names:
+            success, message = persistence.save_model(name, {
+                'model': DummyRegressor(),
+                'metrics': metrics,
+                'params': {},
+                'predictions': {'y_test': y_test, 'y_pred': y_test + rng.normal(0, 0.1, args.rows)}
+            })
+            assert success, message
+
+        tracemalloc.start()
+        loaded = [persistence.load_predictions(name) for name in names]
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        y_tests = [predictions['y_test'] for predictions in loaded]
+        assert all(isinstance(values, np.memmap) for values in y_tests), "y_test dari disk disalin ke heap"
+        assert all(values is y_tests[0] for values in y_tests), "y_test tidak dipakai bersama per split"
+        assert np.array_equal(y_tests[0], y_test)
+
+        print(f"Models: {args.models} | y_test: {y_test.nbytes / 1e6:.1f} MB per split")
+        print(f"y_test memmap bersama: ya | Peak heap saat load: {peak / 1e6:.2f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,278 @@
+import io
+import os
+import time
+import threading
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# Format yang bisa diupload di halaman Model
+SUPPORTED_FORMATS = ["xlsx", "csv", "parquet", "feather"]
+# Budget ukuran salinan Parquet hasil konversi xlsx (MB), salinan yang paling lama tidak dipakai dihapus lebih dulu
+DATASET_CACHE_BUDGET_MB = int(os.environ.get("DATASET_CACHE_BUDGET_MB", "1024"))
+
+
+def _current_rss():
+    """RSS proses saat ini dalam bytes (psutil jika ada, fallback /proc), None jika tidak tersedia"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class _PeakMemorySampler:
+    """
+    Sampling RSS di thread terpisah untuk mengukur peak memori parsing.
+
+    Lebih ringan daripada tracemalloc (yang memperlambat openpyxl beberapa
+    kali lipat) dan ikut menghitung buffer Arrow.
+    """
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.baseline = None
+        self.peak = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.baseline = _current_rss()
+        self.peak = self.baseline
+        if self.baseline is not None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            rss = _current_rss()
+            if rss is not None and rss > self.peak:
+                self.peak = rss
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            rss = _current_rss()
+            if rss is not None and rss > self.peak:
+                self.peak = rss
+        return False
+
+    @property
+    def peak_delta_mb(self):
+        """Kenaikan RSS maksimum selama blok berjalan (MB), None jika tidak terukur"""
+        if self.baseline is None:
+            return None
+        return (self.peak - self.baseline) / (1024 * 1024)
+
+
+def get_file_format(file_name):
+    """Dapatkan format file dari ekstensi nama file"""
+    ext = os.path.splitext(file_name or "")[1].lower().lstrip(".")
+    if ext not in SUPPORTED_FORMATS:
+        raise ValueError(f"Format file tidak didukung: '{ext}'. Gunakan {', '.join(SUPPORTED_FORMATS)}.")
+    return ext
+
+
+def _require_pyarrow(file_format):
+    if not HAS_PYARROW:
+        raise ImportError(f"Format {file_format} membutuhkan pyarrow. Install dengan: pip install pyarrow")
+
+
+def _converted_path(cache_dir, file_hash):
+    return os.path.join(cache_dir, f"{file_hash}.parquet")
+
+
+def _save_converted_copy(data, cache_dir, file_hash):
+    """Simpan salinan Parquet dari xlsx (best effort, gagal = tidak di-cache)"""
+    if not HAS_PYARROW:
+        return False
+    path = _converted_path(cache_dir, file_hash)
+    # Sesi Streamlit adalah thread di proses yang sama: pid saja tidak unik
+    tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        data.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    except Exception:
+        # Mis. kolom object campuran yang tidak bisa dikonversi ke Arrow
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+
+    prune_dataset_cache(cache_dir, protect=path)
+    return True
+
+
+def prune_dataset_cache(cache_dir, budget_bytes=None, protect=None):
+    """
+    Hapus salinan Parquet yang paling lama tidak dipakai (mtime) sampai total ukuran <= budget
+
+    Returns:
+        Jumlah file yang dihapus
+    """
+    budget_bytes = budget_bytes or DATASET_CACHE_BUDGET_MB * 1024 * 1024
+    files = []
+    for entry in os.scandir(cache_dir):
+        if entry.name.endswith(".parquet"):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total_size = sum(size for _, size, _ in files)
+    removed = 0
+    for _, size, path in sorted(files):
+        if total_size <= budget_bytes:
+            break
+        if path == protect:
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total_size -= size
+        removed += 1
+    return removed
+
+
+def read_dataset(file_bytes, file_name, file_hash=None, cache_dir=None):
+    """
+    Baca dataset dari isi file yang diupload
+
+    CSV, Parquet dan Feather dibaca lewat reader berbasis pyarrow.
+    File xlsx dikonversi sekali ke Parquet di cache_dir (jika file_hash
+    dan cache_dir diberikan), sehingga load berikutnya bersifat kolomnar.
+
+    Args:
+        file_bytes: Isi file (bytes)
+        file_name: Nama file asli (menentukan format)
+        file_hash: Hash isi file, kunci salinan Parquet
+        cache_dir: Folder salinan Parquet hasil konversi xlsx
+
+    Returns:
+        data: DataFrame
+        source: Cara data dibaca ('xlsx', 'csv', 'parquet', 'feather', 'parquet-cache')
+    """
+    file_format = get_file_format(file_name)
+
+    if file_format == "xlsx":
+        if file_hash and cache_dir and HAS_PYARROW:
+            path = _converted_path(cache_dir, file_hash)
+            if os.path.exists(path):
+                try:
+                    data = pd.read_parquet(path)
+                    # Tandai baru dipakai (urutan LRU untuk prune_dataset_cache)
+                    os.utime(path)
+                    return data, "parquet-cache"
+                except Exception:
+                    pass
+
+        data = pd.read_excel(io.BytesIO(file_bytes))
+        if file_hash and cache_dir:
+            _save_converted_copy(data, cache_dir, file_hash)
+        return data, file_format
+
+    if file_format == "csv":
+        engine = "pyarrow" if HAS_PYARROW else "c"
+        return pd.read_csv(io.BytesIO(file_bytes), engine=engine), file_format
+
+    _require_pyarrow(file_format)
+    if file_format == "parquet":
+        return pd.read_parquet(io.BytesIO(file_bytes)), file_format
+    return pd.read_feather(io.BytesIO(file_bytes)), file_format
+
+
+def read_dataset_with_stats(file_bytes, file_name, file_hash=None, cache_dir=None):
+    """
+    Sama dengan read_dataset, ditambah statistik parsing untuk ditampilkan di UI
+
+    Peak memory adalah kenaikan RSS proses selama parsing (sampling tiap 10 ms).
+
+    Returns:
+        data: DataFrame
+        stats: Dictionary berisi format, source, parse_seconds, peak_memory_mb, frame_memory_mb
+    """
+    with _PeakMemorySampler() as sampler:
+        start = time.perf_counter()
+        data, source = read_dataset(file_bytes, file_name, file_hash=file_hash, cache_dir=cache_dir)
+        elapsed = time.perf_counter() - start
+
+    stats = {
+        'format': get_file_format(file_name),
+        'source': source,
+        'parse_seconds': elapsed,
+        'peak_memory_mb': sampler.peak_delta_mb,
+        'frame_memory_mb': data.memory_usage(deep=True).sum() / (1024 * 1024),
+        'file_size_mb': len(file_bytes) / (1024 * 1024)
+    }
+    return data, stats
+
+
+def iter_dataset_chunks(source, file_name, chunk_rows=12288):
+    """
+    Baca dataset per potongan baris tanpa memuat seluruh sheet/file
+
+    xlsx dibaca dengan openpyxl read_only=True (baris per baris), CSV
+    dengan read_csv(chunksize=...), Parquet dan Feather per record batch.
+
+    Args:
+        source: Path file atau file-like object
+        file_name: Nama file (menentukan format)
+        chunk_rows: Jumlah baris per potongan
+
+    Yields:
+        DataFrame dengan maksimal chunk_rows baris
+    """
+    file_format = get_file_format(file_name)
+
+    if file_format == "xlsx":
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(source, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            columns = [str(col) for col in header]
+            buffer = []
+            for row in rows:
+                buffer.append(row)
+                if len(buffer) >= chunk_rows:
+                    yield pd.DataFrame(buffer, columns=columns)
+                    buffer = []
+            if buffer:
+                yield pd.DataFrame(buffer, columns=columns)
+        finally:
+            workbook.close()
+
+    elif file_format == "csv":
+        yield from pd.read_csv(source, chunksize=chunk_rows)
+
+    elif file_format == "parquet":
+        _require_pyarrow(file_format)
+        import pyarrow.parquet as pq
+
+        for record_batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_rows):
+            yield record_batch.to_pandas()
+
+    else:
+        _require_pyarrow(file_format)
+        import pyarrow.ipc as ipc
+
+        # Feather v2 = Arrow IPC file, dibaca per record batch
+        reader = ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i).to_pandas()
@@ -0,0 +1,389 @@
+import warnings
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Naikkan versi ini setiap kali definisi fitur berubah
+FEATURE_SPEC_VERSION = 1
+
+# Urutan statistik per kolom (harus sama dengan urutan fitur lama)
+STAT_NAMES = [
+    'mean', 'std', 'min', 'max', 'median',
+    'first', 'mid', 'last',
+    'trend', 'range',
+    'q25', 'q75',
+    'seg1', 'seg2', 'seg3', 'seg_trend1', 'seg_trend2'
+]
+
+# Kolom non-fitur yang dibuang sebelum ekstraksi
+DROP_COLUMNS = ['Date', 'LIST_NUMBER']
+
+# Jumlah window yang diproses sekaligus (membatasi memori sementara saat stride kecil)
+WINDOW_CHUNK_SIZE = 4096
+
+
+def get_feature_columns(data):
+    """Dapatkan nama kolom fitur (semua kecuali TARGET dan kolom non-fitur)"""
+    return [col for col in data.columns if col != 'TARGET' and col not in DROP_COLUMNS]
+
+
+def get_feature_names(feature_cols):
+    """Nama kolom output: <kolom>_<statistik>, dikelompokkan per kolom"""
+    return [f'{col}_{stat}' for col in feature_cols for stat in STAT_NAMES]
+
+
+def _quantile_sorted(sorted_windows, q, count=None):
+    """
+    Quantile linear (sama dengan pandas/numpy default) dari window yang sudah di-sort.
+
+    Jika count diberikan (jumlah nilai non-NaN per window/kolom), NaN yang
+    ada di ujung hasil sort diabaikan seperti skipna=True milik pandas.
+    """
+    n = sorted_windows.shape[1]
+    if count is None:
+        pos = q * (n - 1)
+        lo = int(np.floor(pos))
+        hi = min(lo + 1, n - 1)
+        frac = pos - lo
+        return sorted_windows[:, lo] + (sorted_windows[:, hi] - sorted_windows[:, lo]) * frac
+
+    pos = q * np.maximum(count - 1, 0)
+    lo = np.floor(pos).astype(np.intp)
+    hi = np.minimum(lo + 1, np.maximum(count - 1, 0))
+    frac = pos - lo
+    lo_val = np.take_along_axis(sorted_windows, lo[:, None, :], axis=1)[:, 0]
+    hi_val = np.take_along_axis(sorted_windows, hi[:, None, :], axis=1)[:, 0]
+    result = lo_val + (hi_val - lo_val) * frac
+    result[count == 0] = np.nan
+    return result
+
+
+def compute_window_features(windows):
+    """
+    Hitung semua fitur statistik untuk sekumpulan window sekaligus.
+
+    Args:
+        windows: Array (n_windows, window_size, n_cols)
+
+    Returns:
+        Array (n_windows, n_cols * len(STAT_NAMES)) dengan urutan kolom
+        yang sama dengan get_feature_names()
+    """
+    n_windows, window_size, n_cols = windows.shape
+    if window_size < 2:
+        raise ValueError("window_size minimal 2 untuk menghitung fitur statistik.")
+
+    mid_idx = window_size // 2
+    seg_a = window_size // 3
+    seg_b = 2 * window_size // 3
+
+    # Satu kali sort untuk min, max, median dan kuartil (NaN selalu di akhir)
+    sorted_windows = np.sort(windows, axis=1)
+    has_nan = np.isnan(sorted_windows[:, -1]).any()
+
+    if not has_nan:
+        mean = windows.mean(axis=1)
+        std = windows.std(axis=1, ddof=1)
+        w_min = sorted_windows[:, 0]
+        w_max = sorted_windows[:, -1]
+        median = _quantile_sorted(sorted_windows, 0.5)
+        q25 = _quantile_sorted(sorted_windows, 0.25)
+        q75 = _quantile_sorted(sorted_windows, 0.75)
+        seg1 = windows[:, :seg_a].mean(axis=1)
+        seg2 = windows[:, seg_a:seg_b].mean(axis=1)
+        seg3 = windows[:, seg_b:].mean(axis=1)
+    else:
+        # Meniru skipna=True milik pandas
+        count = (~np.isnan(windows)).sum(axis=1)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', category=RuntimeWarning)
+            mean = np.nanmean(windows, axis=1)
+            std = np.nanstd(windows, axis=1, ddof=1)
+            seg1 = np.nanmean(windows[:, :seg_a], axis=1)
+            seg2 = np.nanmean(windows[:, seg_a:seg_b], axis=1)
+            seg3 = np.nanmean(windows[:, seg_b:], axis=1)
+        w_min = sorted_windows[:, 0]
+        w_max = _quantile_sorted(sorted_windows, 1.0, count)
+        median = _quantile_sorted(sorted_windows, 0.5, count)
+        q25 = _quantile_sorted(sorted_windows, 0.25, count)
+        q75 = _quantile_sorted(sorted_windows, 0.75, count)
+
+    first = windows[:, 0]
+    mid = windows[:, mid_idx]
+    last = windows[:, -1]
+
+    stats = {
+        'mean': mean,
+        'std': std,
+        'min': w_min,
+        'max': w_max,
+        'median': median,
+        'first': first,
+        'mid': mid,
+        'last': last,
+        'trend': last - first,
+        'range': w_max - w_min,
+        'q25': q25,
+        'q75': q75,
+        'seg1': seg1,
+        'seg2': seg2,
+        'seg3': seg3,
+        'seg_trend1': seg2 - seg1,
+        'seg_trend2': seg3 - seg2,
+    }
+
+    # (n_windows, n_cols, n_stats) -> (n_windows, n_cols * n_stats)
+    stacked = np.stack([stats[name] for name in STAT_NAMES], axis=2)
+    return stacked.reshape(n_windows, n_cols * len(STAT_NAMES))
+
+
+def to_numeric_array(data, feature_cols):
+    """Konversi kolom fitur ke array float64 (n_rows, n_cols)"""
+    return data[feature_cols].to_numpy(dtype=np.float64)
+
+
+def make_windows(values, batch_size=48, stride=None):
+    """
+    Buat view window (n_windows, batch_size, n_cols) tanpa menyalin data.
+
+    Args:
+        values: Array (n_rows, n_cols)
+        batch_size: Panjang window
+        stride: Jarak antar awal window (None = batch_size, tidak overlap)
+
+    Returns:
+        View read-only hasil sliding_window_view
+    """
+    stride = batch_size if stride is None else int(stride)
+    if stride < 1:
+        raise ValueError("stride harus >= 1.")
+
+    if len(values) < batch_size:
+        return np.empty((0, batch_size, values.shape[1]), dtype=values.dtype)
+
+    # sliding_window_view -> (n_rows - batch_size + 1, n_cols, batch_size)
+    windows = sliding_window_view(values, batch_size, axis=0)[::stride]
+    return windows.transpose(0, 2, 1)
+
+
+def get_window_end_index(n_rows, batch_size=48, stride=None):
+    """Index baris terakhir dari setiap window (posisi TARGET)"""
+    stride = batch_size if stride is None else int(stride)
+    if stride < 1:
+        raise ValueError("stride harus >= 1.")
+    if n_rows < batch_size:
+        return np.empty(0, dtype=np.int64)
+    return np.arange(batch_size - 1, n_rows, stride)
+
+
+def compute_features_chunked(windows, chunk_size=WINDOW_CHUNK_SIZE):
+    """Hitung fitur per potongan window agar salinan sementara (sort, isnan) tetap kecil"""
+    n_windows, _, n_cols = windows.shape
+    out = np.empty((n_windows, n_cols * len(STAT_NAMES)), dtype=np.float64)
+    for start in range(0, n_windows, chunk_size):
+        stop = min(start + chunk_size, n_windows)
+        out[start:stop] = compute_window_features(windows[start:stop])
+    return out
+
+
+def build_batch_features(data, batch_size=48, stride=None):
+    """
+    Ekstrak fitur statistik dari window batch_size baris.
+
+    Tanpa stride, window tidak overlap (blok 48 baris seperti sebelumnya).
+    Dengan stride < batch_size, window overlap dibuat sebagai strided view
+    sehingga tidak ada window yang disalin.
+
+    Args:
+        data: DataFrame dengan kolom fitur + kolom TARGET
+        batch_size: Ukuran batch (default 48)
+        stride: Jarak antar window (default None = batch_size)
+
+    Returns:
+        X: DataFrame dengan fitur statistik
+        y: Series dengan target (baris terakhir setiap window)
+        feature_names: List nama fitur
+    """
+    if 'TARGET' not in data.columns:
+        raise ValueError("Column 'TARGET' not found in dataset.")
+
+    feature_cols = get_feature_columns(data)
+    feature_names = get_feature_names(feature_cols)
+
+    values = to_numeric_array(data, feature_cols)
+    windows = make_windows(values, batch_size=batch_size, stride=stride)
+    end_idx = get_window_end_index(len(data), batch_size=batch_size, stride=stride)
+
+    X = pd.DataFrame(compute_features_chunked(windows), columns=feature_names, copy=False)
+    y = pd.Series(data['TARGET'].to_numpy()[end_idx], name='TARGET')
+
+    return X, y, feature_names
+
+
+class PrefixSumIndex:
+    """
+    Index kumulatif (sum, sum kuadrat, jumlah non-NaN) atas kolom mentah.
+
+    Dibangun sekali per dataset. Setelah itu mean, std, mean segmen dan
+    trend untuk batch_size / stride / jumlah segmen apa pun dihitung O(1)
+    per window tanpa memindai ulang data. Statistik urutan (min, max,
+    median, kuartil) tidak bisa dihitung dari prefix sum, gunakan
+    build_batch_features untuk set fitur lengkap.
+    """
+
+    STAT_NAMES = ['mean', 'std', 'first', 'mid', 'last', 'trend']
+
+    def __init__(self, values, target, feature_cols):
+        self.feature_cols = list(feature_cols)
+        self.n_rows = len(values)
+        self.values = values
+        self.target = target
+
+        # Geser per kolom agar sum kuadrat tidak kehilangan presisi
+        valid = ~np.isnan(values)
+        self.offset = np.nanmean(values, axis=0) if self.n_rows else np.zeros(values.shape[1])
+        self.offset = np.where(np.isnan(self.offset), 0.0, self.offset)
+        centered = np.where(valid, values - self.offset, 0.0)
+
+        n_cols = values.shape[1]
+        self.csum = np.zeros((self.n_rows + 1, n_cols))
+        self.csq = np.zeros((self.n_rows + 1, n_cols))
+        self.ccount = np.zeros((self.n_rows + 1, n_cols))
+        np.cumsum(centered, axis=0, out=self.csum[1:])
+        np.cumsum(centered * centered, axis=0, out=self.csq[1:])
+        np.cumsum(valid, axis=0, out=self.ccount[1:])
+
+    @classmethod
+    def from_frame(cls, data):
+        """Bangun index dari DataFrame mentah (kolom fitur + TARGET)"""
+        if 'TARGET' not in data.columns:
+            raise ValueError("Column 'TARGET' not found in dataset.")
+        feature_cols = get_feature_columns(data)
+        return cls(to_numeric_array(data, feature_cols), data['TARGET'].to_numpy(), feature_cols)
+
+    def _range_sums(self, start, stop):
+        """(sum, sum kuadrat, count) untuk baris [start, stop) - terpusat pada offset"""
+        return (
+            self.csum[stop] - self.csum[start],
+            self.csq[stop] - self.csq[start],
+            self.ccount[stop] - self.ccount[start]
+        )
+
+    def _range_mean(self, start, stop):
+        s, _, n = self._range_sums(start, stop)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return s / n + self.offset
+
+    def get_feature_names(self, n_segments=3):
+        """Nama fitur yang dihasilkan window_features()"""
+        stats = self.STAT_NAMES + [f'seg{k + 1}' for k in range(n_segments)]
+        stats += [f'seg_trend{k + 1}' for k in range(n_segments - 1)]
+        return [f'{col}_{stat}' for col in self.feature_cols for stat in stats]
+
+    def window_features(self, batch_size=48, stride=None, n_segments=3):
+        """
+        Fitur berbasis prefix sum untuk setiap window.
+
+        Args:
+            batch_size: Panjang window
+            stride: Jarak antar window (None = batch_size)
+            n_segments: Jumlah segmen untuk seg<k> dan seg_trend<k>
+
+        Returns:
+            X: DataFrame fitur
+            y: Series target (baris terakhir setiap window)
+            feature_names: List nama fitur
+        """
+        if batch_size < 2:
+            raise ValueError("batch_size minimal 2.")
+        if not 1 <= n_segments <= batch_size:
+            raise ValueError("n_segments harus antara 1 dan batch_size.")
+
+        end_idx = get_window_end_index(self.n_rows, batch_size=batch_size, stride=stride)
+        starts = end_idx - (batch_size - 1)
+        stops = end_idx + 1
+
+        s, sq, n = self._range_sums(starts, stops)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_c = s / n
+            var = (sq - n * mean_c * mean_c) / (n - 1)
+        mean = mean_c + self.offset
+        std = np.sqrt(np.clip(var, 0.0, None))
+        std[n < 2] = np.nan
+
+        first = self.values[starts]
+        mid = self.values[starts + batch_size // 2]
+        last = self.values[end_idx]
+
+        stats = [mean, std, first, mid, last, last - first]
+
+        bounds = [k * batch_size // n_segments for k in range(n_segments + 1)]
+        segments = [self._range_mean(starts + bounds[k], starts + bounds[k + 1]) for k in range(n_segments)]
+        stats += segments
+        stats += [segments[k + 1] - segments[k] for k in range(n_segments - 1)]
+
+        n_windows = len(end_idx)
+        stacked = np.stack(stats, axis=2).reshape(n_windows, -1)
+        feature_names = self.get_feature_names(n_segments)
+
+        X = pd.DataFrame(stacked, columns=feature_names, copy=False)
+        y = pd.Series(self.target[end_idx], name='TARGET')
+        return X, y, feature_names
+
+
+def stream_batch_features(chunks, batch_size=48):
+    """
+    Ekstrak fitur batch tidak overlap dari aliran potongan DataFrame.
+
+    Baris dikumpulkan di buffer; setiap batch yang sudah lengkap langsung
+    diubah menjadi satu baris fitur, sisa baris dibawa ke potongan berikutnya.
+    Peak memori = satu potongan input + matriks fitur output, sehingga file
+    yang jauh lebih besar dari RAM tetap bisa diproses. Hasilnya identik
+    dengan build_batch_features(data, batch_size).
+
+    Args:
+        chunks: Iterable DataFrame (mis. dari data_loader.iter_dataset_chunks)
+        batch_size: Ukuran batch (default 48)
+
+    Returns:
+        X: DataFrame dengan fitur statistik
+        y: Series dengan target (baris terakhir setiap batch)
+        feature_names: List nama fitur
+    """
+    feature_cols = None
+    pending_values = None
+    pending_target = None
+    X_blocks, y_blocks = [], []
+
+    for chunk in chunks:
+        if feature_cols is None:
+            if 'TARGET' not in chunk.columns:
+                raise ValueError("Column 'TARGET' not found in dataset.")
+            feature_cols = get_feature_columns(chunk)
+            pending_values = np.empty((0, len(feature_cols)))
+            pending_target = np.empty(0)
+
+        values = np.concatenate([pending_values, to_numeric_array(chunk, feature_cols)])
+        target = np.concatenate([pending_target, chunk['TARGET'].to_numpy(dtype=np.float64)])
+
+        n_batches = len(values) // batch_size
+        n_rows = n_batches * batch_size
+        if n_batches:
+            windows = values[:n_rows].reshape(n_batches, batch_size, len(feature_cols))
+            X_blocks.append(compute_features_chunked(windows))
+            y_blocks.append(target[batch_size - 1:n_rows:batch_size])
+
+        pending_values = values[n_rows:]
+        pending_target = target[n_rows:]
+
+    if feature_cols is None:
+        raise ValueError("Dataset kosong.")
+
+    feature_names = get_feature_names(feature_cols)
+    n_features = len(feature_names)
+    X_values = np.concatenate(X_blocks) if X_blocks else np.empty((0, n_features))
+    y_values = np.concatenate(y_blocks) if y_blocks else np.empty(0)
+
+    X = pd.DataFrame(X_values, columns=feature_names, copy=False)
+    y = pd.Series(y_values, name='TARGET')
+    return X, y, feature_names
@@ -0,0 +1,180 @@
+import os
+import json
+import shutil
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+from ml.feature_engine import FEATURE_SPEC_VERSION
+
+# Budget ukuran feature store di disk (MB), entry yang paling lama tidak dipakai dihapus lebih dulu
+FEATURE_STORE_BUDGET_MB = int(os.environ.get("FEATURE_STORE_BUDGET_MB", "4096"))
+
+
+def compute_file_hash(file_bytes):
+    """Hash isi file (sha256) untuk kunci cache"""
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+class FeatureStore:
+    """
+    Simpan matriks fitur X/y hasil prepare_batch_data ke disk (.npy).
+
+    Setiap entry disimpan di folder sendiri dengan kunci hash isi file +
+    opsi batching + versi spesifikasi fitur, sehingga upload ulang dataset
+    yang sama (dari sesi mana pun, juga setelah restart server) cukup
+    membaca file .npy tanpa menghitung ulang fitur. Total ukuran dibatasi
+    budget_bytes: setelah setiap save, entry yang paling lama tidak dimuat
+    (mtime meta.json, disentuh setiap load) dihapus sampai muat lagi.
+    """
+
+    def __init__(self, base_dir="feature_store", budget_bytes=None):
+        self.base_dir = base_dir
+        self.budget_bytes = budget_bytes or FEATURE_STORE_BUDGET_MB * 1024 * 1024
+        os.makedirs(self.base_dir, exist_ok=True)
+
+    def make_key(self, file_hash, **options):
+        """Bangun kunci entry dari hash file dan opsi feature engineering"""
+        parts = {'file': file_hash, 'spec': FEATURE_SPEC_VERSION}
+        parts.update({k: options[k] for k in sorted(options)})
+        raw = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:32]
+
+    def _entry_dir(self, key):
+        return os.path.join(self.base_dir, key)
+
+    def exists(self, key):
+        """Cek apakah entry sudah lengkap di disk"""
+        return os.path.exists(os.path.join(self._entry_dir(key), 'meta.json'))
+
+    def load(self, key):
+        """
+        Muat X, y, feature_names dari store
+
+        Returns:
+            Tuple (X, y, feature_names) atau None jika belum ada
+        """
+        entry_dir = self._entry_dir(key)
+        meta_path = os.path.join(entry_dir, 'meta.json')
+        if not os.path.exists(meta_path):
+            return None
+
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            # Tandai baru dipakai (urutan LRU untuk prune)
+            os.utime(meta_path)
+
+            # Memory-map: data baru dibaca dari disk saat dipakai
+            X_values = np.load(os.path.join(entry_dir, 'X.npy'), mmap_mode='r', allow_pickle=False)
+            y_values = np.load(os.path.join(entry_dir, 'y.npy'), allow_pickle=False)
+        except (OSError, ValueError):
+            # Entry rusak/setengah tertulis: anggap cache miss
+            return None
+
+        feature_names = meta['feature_names']
+        X = pd.DataFrame(X_values, columns=feature_names, copy=False)
+        y = pd.Series(y_values, name='TARGET')
+        return X, y, feature_names
+
+    def save(self, key, X, y, feature_names, **info):
+        """
+        Simpan X, y, feature_names ke store
+
+        File ditulis ke folder sementara lalu di-rename, sehingga pembaca
+        tidak pernah melihat entry yang setengah tertulis.
+        """
+        entry_dir = self._entry_dir(key)
+        # Sesi Streamlit adalah thread di proses yang sama: pid saja tidak unik
+        tmp_dir = f"{entry_dir}.tmp-{os.getpid()}-{threading.get_ident()}"
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        try:
+            np.save(os.path.join(tmp_dir, 'X.npy'), np.ascontiguousarray(X.to_numpy(dtype=np.float64)))
+            np.save(os.path.join(tmp_dir, 'y.npy'), np.asarray(y.to_numpy()))
+
+            meta = {
+                'feature_names': list(feature_names),
+                'n_samples': int(len(X)),
+                'spec_version': FEATURE_SPEC_VERSION,
+                **info
+            }
+            with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+                json.dump(meta, f, indent=4, default=str)
+
+            if os.path.exists(entry_dir):
+                shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(tmp_dir, entry_dir)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return False
+
+        self.prune(protect=key)
+        return True
+
+    def get_or_compute(self, key, compute_fn, **info):
+        """
+        Muat dari store, atau hitung dengan compute_fn() lalu simpan
+
+        Returns:
+            Tuple (X, y, feature_names, from_cache)
+        """
+        cached = self.load(key)
+        if cached is not None:
+            return (*cached, True)
+
+        X, y, feature_names = compute_fn()
+        self.save(key, X, y, feature_names, **info)
+        return X, y, feature_names, False
+
+    def _entries(self):
+        """List (key, ukuran bytes, waktu terakhir dipakai) entry lengkap, terlama lebih dulu"""
+        entries = []
+        for name in os.listdir(self.base_dir):
+            entry_dir = self._entry_dir(name)
+            if '.tmp-' in name or not os.path.isdir(entry_dir):
+                continue
+            try:
+                last_used = os.path.getmtime(os.path.join(entry_dir, 'meta.json'))
+                size = sum(entry.stat().st_size for entry in os.scandir(entry_dir))
+            except OSError:
+                # Sedang dihapus/ditulis ulang oleh sesi lain
+                continue
+            entries.append((name, size, last_used))
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def prune(self, protect=None):
+        """
+        Hapus entry yang paling lama tidak dipakai sampai total ukuran <= budget_bytes
+
+        Returns:
+            Jumlah entry yang dihapus
+        """
+        entries = self._entries()
+        total_size = sum(size for _, size, _ in entries)
+        removed = 0
+        for key, size, _ in entries:
+            if total_size <= self.budget_bytes:
+                break
+            if key == protect:
+                continue
+            # Pembaca yang masih memegang memory-map tetap aman (file baru benar-benar hilang setelah ditutup)
+            shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+            total_size -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        """Hapus semua entry (folder sementara milik writer yang sedang berjalan dilewati)"""
+        for key, _, _ in self._entries():
+            shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+
+    def get_storage_info(self):
+        """Jumlah entry, ukuran dan budget store"""
+        entries = self._entries()
+        return {
+            'entry_count': len(entries),
+            'total_size_mb': round(sum(size for _, size, _ in entries) / (1024 * 1024), 2),
+            'budget_mb': round(self.budget_bytes / (1024 * 1024), 2),
+            'base_dir': self.base_dir
+        }
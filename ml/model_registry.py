@@ -0,0 +1,78 @@
+import importlib
+
+# Perkiraan kasar memori proses training per family (MB, diukur dari peak RSS
+# worker pada data kecil: interpreter + library + estimator), dipakai admission control
+FAMILY_MEMORY_MB = {"sklearn": 300, "xgboost": 300, "catboost": 350, "keras": 900}
+
+
+class ModelSpec:
+    """
+    Deskripsi satu model: library asal, nama class dan argumen default.
+
+    Library (xgboost, catboost, keras/TensorFlow, ...) baru di-import saat
+    model pertama kali dibuat, sehingga import ml.model_trainer tetap ringan.
+    thread_param adalah nama parameter estimator yang mengatur jumlah thread
+    (None = training single-thread). memory_mb adalah perkiraan memori dasar
+    proses training (default dari FAMILY_MEMORY_MB).
+    """
+
+    def __init__(self, name, module, class_name=None, family="sklearn", default_kwargs=None, thread_param=None,
+                 memory_mb=None):
+        self.name = name
+        self.module = module
+        self.class_name = class_name
+        self.family = family
+        self.default_kwargs = default_kwargs or {}
+        self.thread_param = thread_param
+        self.memory_mb = memory_mb or FAMILY_MEMORY_MB.get(family, 300)
+
+    @property
+    def is_multithreaded(self):
+        """Apakah training model ini bisa memakai lebih dari satu core"""
+        return self.thread_param is not None or self.family == "keras"
+
+    def load_class(self):
+        """Import library dan kembalikan class estimator"""
+        module = importlib.import_module(self.module)
+        return getattr(module, self.class_name)
+
+    def create(self, params):
+        """Buat instance estimator dengan parameter dari sidebar"""
+        if self.family == "keras":
+            # Arsitektur LSTM dibangun di train_model (butuh window_size dan n_features)
+            return self.name
+        estimator_class = self.load_class()
+        return estimator_class(**self.default_kwargs, **params)
+
+
+MODEL_REGISTRY = {
+    spec.name: spec for spec in [
+        ModelSpec("Dummy Regressor", "sklearn.dummy", "DummyRegressor"),
+        ModelSpec("Linear Regression", "sklearn.linear_model", "LinearRegression"),
+        ModelSpec("Decision Tree", "sklearn.tree", "DecisionTreeRegressor"),
+        ModelSpec("Random Forest", "sklearn.ensemble", "RandomForestRegressor", thread_param="n_jobs"),
+        ModelSpec("XGBoost", "xgboost", "XGBRegressor", family="xgboost", thread_param="n_jobs"),
+        ModelSpec("CatBoost", "catboost", "CatBoostRegressor", family="catboost",
+                  default_kwargs={"verbose": 0, "allow_writing_files": False}, thread_param="thread_count"),
+        ModelSpec("SVR", "sklearn.svm", "SVR"),
+        ModelSpec("LSTM", "keras", family="keras"),
+    ]
+}
+
+
+def get_model_spec(model_name):
+    """Ambil ModelSpec berdasarkan nama model"""
+    spec = MODEL_REGISTRY.get(model_name)
+    if spec is None:
+        raise ValueError(f"Unknown model: {model_name}")
+    return spec
+
+
+def get_model_names():
+    """Nama semua model yang terdaftar (urutan sidebar)"""
+    return list(MODEL_REGISTRY.keys())
+
+
+def create_model(model_name, params):
+    """Buat estimator lewat registry (import library secara lazy)"""
+    return get_model_spec(model_name).create(params)
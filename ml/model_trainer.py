@@ -1,19 +1,35 @@
 import numpy as np
 import pandas as pd
-from sklearn.linear_model import LinearRegression
-from sklearn.tree import DecisionTreeRegressor
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.dummy import DummyRegressor
-from sklearn.svm import SVR
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-from sklearn.preprocessing import MinMaxScaler
-from xgboost import XGBRegressor
-from catboost import CatBoostRegressor
-from keras.models import Sequential
-from keras.layers import LSTM, Dense, Dropout
-from keras.callbacks import EarlyStopping
 from utils.model_persistence import ModelPersistence
+from utils.test_splits import test_splits
+from ml.feature_engine import build_batch_features
+from ml.model_registry import create_model, get_model_spec
+from ml.training_telemetry import TrainingTelemetry, boosting_iterations
+
+# Library berat (sklearn estimators, xgboost, catboost, keras/TensorFlow) di-import
+# secara lazy lewat ml.model_registry atau di dalam fungsi yang membutuhkannya.
+
+# Fraksi data training untuk validasi early stopping jika validation_split tidak diatur
+DEFAULT_VALIDATION_SPLIT = 0.2
+# Family yang mendukung early_stopping_rounds dengan validation split internal
+EARLY_STOPPING_FAMILIES = ("xgboost", "catboost")
+
+def split_validation(X, y, validation_split):
+    """
+    Pisahkan bagian akhir data training sebagai data validasi
+
+    Sama seperti validation_split Keras (tanpa diacak); hasil split_data
+    sudah teracak sehingga bagian akhir tetap sampel acak.
+
+    Returns:
+        Tuple (X_fit, y_fit, X_val, y_val)
+    """
+    split_at = int(np.ceil(len(X) * (1 - validation_split)))
+    if split_at >= len(X) or split_at == 0:
+        raise ValueError(f"Training data too small for validation_split={validation_split}: {len(X)} rows")
+    X_fit, X_val = (X.iloc[:split_at], X.iloc[split_at:]) if hasattr(X, 'iloc') else (X[:split_at], X[split_at:])
+    y_fit, y_val = (y.iloc[:split_at], y.iloc[split_at:]) if hasattr(y, 'iloc') else (y[:split_at], y[split_at:])
+    return X_fit, y_fit, X_val, y_val
 
 class ModelTrainer:
     """Class untuk melatih dan mengevaluasi Model Machine Learning"""
@@ -21,50 +37,62 @@ class ModelTrainer:
     def __init__(self):
         self.model = None
         self.model_name = None
+        self.training_info = None
         self.persistence = ModelPersistence(base_dir="saved_models")
         
     def get_model(self, model_name, params):
         """Initialize model based on name and parameters Inisialisasi model berdasarkan """
-        if model_name == "Linear Regression":
-            return LinearRegression(**params)
-        elif model_name == "Decision Tree":
-            return DecisionTreeRegressor(**params)
-        elif model_name == "Random Forest":
-            return RandomForestRegressor(**params)
-        elif model_name == "Dummy Regressor":
-            return DummyRegressor(**params)
-        elif model_name == "XGBoost":
-            return XGBRegressor(**params)
-        elif model_name == "CatBoost":
-            return CatBoostRegressor(verbose=0, **params)
-        elif model_name == "SVR":
-            return SVR(**params)
-        elif model_name == "LSTM":
-            return "LSTM"
-        else:
-            raise ValueError(f"Unknown model: {model_name}")
+        return create_model(model_name, params)
     
-    def train_model(self, X_train, y_train, model_name, params):
-        """Train the selected model"""
+    def train_model(self, X_train, y_train, model_name, params, progress_callback=None):
+        """
+        Train the selected model
+
+        Args:
+            params: Parameter estimator; untuk XGBoost dan CatBoost,
+                early_stopping_rounds mengaktifkan early stopping pada
+                validation_split (default DEFAULT_VALIDATION_SPLIT) data training
+            progress_callback: Fungsi (stage, info) opsional; XGBoost, CatBoost dan
+                LSTM memanggilnya selama training dengan info ringkasan
+                TrainingTelemetry (iterasi, loss, throughput, ETA, history)
+        """
         self.model_name = model_name
+        self.training_info = None
+        # validation_split bukan argumen estimator
+        params = dict(params)
+        validation_split = params.pop("validation_split", None)
         model = self.get_model(model_name, params)
         
+        telemetry = None
+        if progress_callback is not None:
+            telemetry = TrainingTelemetry(on_update=lambda summary: progress_callback('training', summary))
+        
         if model_name == "LSTM":
+            from sklearn.preprocessing import MinMaxScaler
+            from keras.models import Sequential
+            from keras.layers import LSTM, Dense, Dropout
+            from keras.callbacks import EarlyStopping
+            from ml.sequence_data import make_train_val_sequences
+            
             # Normalisasi data
             scaler_X = MinMaxScaler()
             scaler_y = MinMaxScaler()
             X_scaled = scaler_X.fit_transform(X_train)
             y_scaled = scaler_y.fit_transform(y_train.values.reshape(-1, 1))
             
-            # Bentuk urutan (sequence)
+            # Bentuk urutan (sequence) per batch, tidak dimaterialisasi sekaligus
             window_size = params.get("window_size", 10)
-            X_seq, y_seq = self.create_sequences(X_scaled, y_scaled, window_size)
+            batch_size = params.get("batch_size", 32)
+            train_seq, val_seq, n_samples = make_train_val_sequences(
+                X_scaled, y_scaled, window_size, batch_size,
+                validation_split=validation_split or DEFAULT_VALIDATION_SPLIT
+            )
 
             # Validasi panjang data
-            if len(X_seq) == 0 or len(X_seq) != len(y_seq):
-                raise ValueError(f"Invalid sequence shapes: X_seq={X_seq.shape}, y_seq={y_seq.shape}")
+            if n_samples == 0 or len(train_seq) == 0:
+                raise ValueError(f"Training data too small for window_size={window_size}: {len(X_scaled)} rows")
             
-            n_features = X_seq.shape[2]
+            n_features = X_scaled.shape[1]
             
             # Definisi model LSTM
             lstm_model = Sequential([
@@ -76,16 +104,25 @@ class ModelTrainer:
             ])
             
             lstm_model.compile(optimizer='adam', loss='mse')
-            early_stop = EarlyStopping(monitor='val_loss', patience=10, restore_best_weights=True)
+            monitor = 'val_loss' if val_seq is not None else 'loss'
+            early_stop = EarlyStopping(monitor=monitor, patience=10, restore_best_weights=True)
+            callbacks = [early_stop]
+            
+            epochs = params.get("epochs", 100)
+            if telemetry is not None:
+                telemetry.total = epochs
+                telemetry.metric_name = 'mse'
+                callbacks.append(telemetry.keras_callback())
             
             lstm_model.fit(
-                X_seq, y_seq,
-                epochs=params.get("epochs", 100),
-                batch_size=params.get("batch_size", 32),
-                validation_split=0.2,
+                train_seq,
+                validation_data=val_seq,
+                epochs=epochs,
                 verbose=0,
-                callbacks=[early_stop]
+                callbacks=callbacks
             )
+            if telemetry is not None:
+                telemetry.flush()
             
             self.model = lstm_model
             self.scaler_X = scaler_X
@@ -97,32 +134,100 @@ class ModelTrainer:
             if len(X_train) != len(y_train):
                 raise ValueError(f"Inconsistent training data sizes: X={len(X_train)}, y={len(y_train)}")
             self.model = model
-            self.model.fit(X_train, y_train)
+            family = get_model_spec(model_name).family
+            
+            X_fit, y_fit, fit_kwargs = X_train, y_train, {}
+            early_stopping = family in EARLY_STOPPING_FAMILIES and params.get("early_stopping_rounds")
+            if early_stopping:
+                X_fit, y_fit, X_val, y_val = split_validation(
+                    X_train, y_train, validation_split or DEFAULT_VALIDATION_SPLIT
+                )
+                if family == "xgboost":
+                    # Early stopping memakai eval_set terakhir; data fit memakai ulang DMatrix training
+                    fit_kwargs = {'eval_set': [(X_fit, y_fit), (X_val, y_val)], 'verbose': False}
+                else:
+                    fit_kwargs = {'eval_set': (X_val, y_val), 'use_best_model': True}
+            
+            if telemetry is None:
+                self.model.fit(X_fit, y_fit, **fit_kwargs)
+            else:
+                fit_kwargs = {**telemetry.attach(family, self.model, X_fit, y_fit), **fit_kwargs}
+                try:
+                    self.model.fit(X_fit, y_fit, **fit_kwargs)
+                finally:
+                    telemetry.detach(family, self.model)
+            
+            if early_stopping:
+                self.training_info = self._apply_best_iteration(family)
+                self.training_info.update({
+                    'early_stopping_rounds': params["early_stopping_rounds"],
+                    'validation_split': validation_split or DEFAULT_VALIDATION_SPLIT
+                })
         
         return self.model
 
-    def create_sequences(self, X, y, window_size):
-        """Membuat urutan data time series"""
-        Xs, ys = [], []
-        for i in range(window_size, len(X)):
-            Xs.append(X[i-window_size:i])
-            ys.append(y[i])
-        return np.array(Xs), np.array(ys)
-    
+    def _apply_best_iteration(self, family):
+        """
+        Potong model booster hasil early stopping ke iterasi terbaiknya
+
+        Pohon setelah iterasi terbaik tidak dipakai predict, jadi tidak ikut
+        disimpan. CatBoost sudah memotong sendiri (use_best_model=True).
+
+        Returns:
+            Dictionary best_iteration (index mulai 0), n_iterations (pohon yang
+            disimpan), iterations_run, max_iterations, best_score, metric, early_stopped
+        """
+        max_iterations = boosting_iterations(family, self.model)
+        
+        if family == "xgboost":
+            booster = self.model.get_booster()
+            iterations_run = booster.num_boosted_rounds()
+            best_iteration = self.model.best_iteration
+            best_score = self.model.best_score
+            metric = next(iter(list(self.model.evals_result().values())[-1]))
+            if best_iteration + 1 < iterations_run:
+                truncated = booster[:best_iteration + 1]
+                truncated.set_attr(best_iteration=str(best_iteration), best_score=str(best_score))
+                # Bangun ulang estimator lewat API publik (save_raw/load_model), bukan mengganti booster internal
+                model = type(self.model)(**self.model.get_params())
+                model.load_model(bytearray(truncated.save_raw("ubj")))
+                self.model = model
+        else:
+            validation = self.model.get_evals_result()['validation']
+            metric, history = next(iter(validation.items()))
+            iterations_run = len(history)
+            best_iteration = self.model.get_best_iteration()
+            best_score = self.model.get_best_score()['validation'][metric]
+        
+        return {
+            'best_iteration': int(best_iteration),
+            'n_iterations': int(best_iteration) + 1,
+            'iterations_run': int(iterations_run),
+            'max_iterations': int(max_iterations),
+            'best_score': float(best_score),
+            'metric': metric,
+            'early_stopped': int(iterations_run) < int(max_iterations)
+        }
+
     def evaluate_model(self, X_test, y_test):
         """Evaluate model performance"""
         if self.model is None:
             raise ValueError("Model has not been trained yet!")
         
+        from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+        
         if self.model_name == "LSTM":
+            from ml.sequence_data import WindowSequence
+            
             X_scaled = self.scaler_X.transform(X_test)
             y_scaled = self.scaler_y.transform(y_test.values.reshape(-1, 1))
             
-            X_seq, y_seq = self.create_sequences(X_scaled, y_scaled, self.window_size)
-            if len(X_seq) == 0:
+            y_seq = y_scaled[self.window_size:]
+            if len(y_seq) == 0:
                 raise ValueError("X_test too small for given window_size.")
             
-            y_pred_scaled = self.model.predict(X_seq).flatten()
+            pred_seq = WindowSequence(X_scaled, window_size=self.window_size, batch_size=256)
+            y_pred_scaled = self.model.predict(pred_seq, verbose=0).flatten()
             y_pred = self.scaler_y.inverse_transform(y_pred_scaled.reshape(-1, 1)).flatten()
             y_true = self.scaler_y.inverse_transform(y_seq)
         else:
@@ -169,10 +274,22 @@ class ModelTrainer:
         return clean_imp
     
     def train_and_save(self, X_train, y_train, X_test, y_test, 
-                       model_name, params, save_name=None, feature_names=None):
-        """Train model, evaluate, dan simpan ke disk"""
+                       model_name, params, save_name=None, feature_names=None, progress_callback=None):
+        """
+        Train model, evaluate, dan simpan ke disk
+
+        Args:
+            progress_callback: Fungsi (stage, info) opsional, dipanggil saat masuk
+                tahap 'training', 'evaluating' dan 'saving' (dipakai job background)
+        """
+        def report(stage, info=None):
+            if progress_callback is not None:
+                progress_callback(stage, info or {})
+        
         try:
-            self.train_model(X_train, y_train, model_name, params)
+            report('training')
+            self.train_model(X_train, y_train, model_name, params, progress_callback=progress_callback)
+            report('evaluating')
             metrics, y_pred = self.evaluate_model(X_test, y_test)
             
             if feature_names is None:
@@ -188,17 +305,23 @@ class ModelTrainer:
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 save_name = f"{model_name}_{timestamp}"
             
+            # Satu array y_test per split, dipakai bersama semua model
+            split_id, y_test = test_splits.share(y_test)
+            
             model_data = {
                 'model': self.model,
                 'metrics': metrics,
                 'params': params,
+                'training': self.training_info,
                 'predictions': {
                     'y_pred': y_pred,
                     'y_test': y_test,
+                    'split_id': split_id,
                     'feature_importance': feature_importance or {}
                 }
             }
             
+            report('saving')
             success, message = self.persistence.save_model(save_name, model_data)
             
             return {
@@ -206,7 +329,10 @@ class ModelTrainer:
                 'model_name': save_name,
                 'metrics': metrics,
                 'y_pred': y_pred,
+                'y_test': y_test,
+                'split_id': split_id,
                 'feature_importance': feature_importance,
+                'training': self.training_info,
                 'save_status': success,
                 'save_message': message
             }
@@ -235,35 +361,26 @@ class ModelTrainer:
         """Dapatkan informasi storage"""
         return self.persistence.get_storage_info()
 
-def prepare_batch_data(data, batch_size=48):
-    """Prepare data by averaging features per batch"""
-    selected_features = [
-        
-    ]
-    
-    n_batches = len(data) // batch_size
-    X_batches, y_batches = [], []
+def prepare_batch_data(data, batch_size=48, stride=None):
+    """
+    Menggunakan feature engineering dari 48 baris untuk prediksi TARGET di baris ke-48.
+    Ekstrak fitur statistik yang merepresentasikan pola temporal dari setiap kolom.
+    Perhitungan dilakukan secara vektor oleh ml.feature_engine.
     
-    for i in range(n_batches):
-        batch = data.iloc[i * batch_size : (i + 1) * batch_size]
-        if "TARGET" not in batch.columns:
-            raise ValueError("Column 'TARGET' not found in dataset.")
-        target_value = batch.iloc[-1]["TARGET"]
-        X_mean = batch[selected_features].mean().values
-        X_batches.append(X_mean)
-        y_batches.append(target_value)
-    
-    X = pd.DataFrame(X_batches, columns=selected_features)
-    y = pd.Series(y_batches, name="TARGET")
-
-    # Sinkronisasi ukuran
-    if len(X) != len(y):
-        min_len = min(len(X), len(y))
-        X = X.iloc[:min_len]
-        y = y.iloc[:min_len]
+    Args:
+        data: DataFrame dengan 16 kolom fitur + 1 kolom TARGET
+        batch_size: Ukuran batch (default 48)
+        stride: Jarak antar window; None = batch tidak overlap,
+            nilai lebih kecil (mis. 1, 6, 12) = sliding window overlap
     
-    return X, y, selected_features
+    Returns:
+        X: DataFrame dengan fitur statistik
+        y: Series dengan target values
+        selected_features: List nama fitur yang digunakan
+    """
+    return build_batch_features(data, batch_size=batch_size, stride=stride)
 
 def split_data(X, y, test_size=0.2, random_state=42):
     """Split data into train and test sets"""
+    from sklearn.model_selection import train_test_split
     return train_test_split(X, y, test_size=test_size, random_state=random_state)
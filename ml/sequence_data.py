@@ -0,0 +1,77 @@
+import math
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from keras.utils import PyDataset
+
+
+class WindowSequence(PyDataset):
+    """
+    Input LSTM yang membentuk window per batch dari array 2D hasil scaling.
+
+    Hanya satu batch (batch_size, window_size, n_features) yang dimaterialisasi
+    setiap langkah, sehingga memori training tetap datar walaupun data
+    bertambah panjang. Batch berikutnya disiapkan oleh worker Keras
+    (prefetch) selama batch sekarang dihitung.
+    """
+
+    def __init__(self, X, y=None, window_size=10, batch_size=32, indices=None,
+                 shuffle=False, seed=42, workers=2, max_queue_size=8):
+        super().__init__(workers=workers, use_multiprocessing=False, max_queue_size=max_queue_size)
+        self.X = np.asarray(X, dtype=np.float32)
+        self.y = None if y is None else np.asarray(y, dtype=np.float32)
+        self.window_size = window_size
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.rng = np.random.default_rng(seed)
+
+        n_samples = max(len(self.X) - window_size, 0)
+        self.indices = np.arange(n_samples) if indices is None else np.asarray(indices)
+
+        # View (N - w + 1, w, n_features) tanpa salinan; baris i = X[i:i + w]
+        if n_samples:
+            self.windows = np.moveaxis(sliding_window_view(self.X, window_size, axis=0), -1, 1)
+        else:
+            self.windows = np.empty((0, window_size, self.X.shape[1]), dtype=np.float32)
+
+        if self.shuffle:
+            self.rng.shuffle(self.indices)
+
+    def __len__(self):
+        return math.ceil(len(self.indices) / self.batch_size)
+
+    def __getitem__(self, idx):
+        batch_idx = self.indices[idx * self.batch_size:(idx + 1) * self.batch_size]
+        X_batch = self.windows[batch_idx]
+        if self.y is None:
+            return (X_batch,)
+        return X_batch, self.y[batch_idx + self.window_size]
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            self.rng.shuffle(self.indices)
+
+
+def make_train_val_sequences(X, y, window_size, batch_size, validation_split=0.2, **kwargs):
+    """
+    Buat WindowSequence train dan validasi
+
+    Pembagian mengikuti validation_split milik Keras: window terakhir
+    (tanpa diacak) menjadi data validasi, sisanya diacak per epoch.
+
+    Returns:
+        Tuple (train_seq, val_seq, n_samples); val_seq None jika data validasi kosong
+    """
+    n_samples = max(len(X) - window_size, 0)
+    split_at = int(math.ceil(n_samples * (1 - validation_split)))
+
+    train_seq = WindowSequence(
+        X, y, window_size=window_size, batch_size=batch_size,
+        indices=np.arange(split_at), shuffle=True, **kwargs
+    )
+    val_seq = None
+    if split_at < n_samples:
+        val_seq = WindowSequence(
+            X, y, window_size=window_size, batch_size=batch_size,
+            indices=np.arange(split_at, n_samples), shuffle=False, **kwargs
+        )
+    return train_seq, val_seq, n_samples
@@ -0,0 +1,328 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import threading
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from utils.file_lock import FileLock, atomic_write
+from ml.training_worker import write_split, read_split, configure_worker_threads
+from ml.training_scheduler import TrainingScheduler
+
+# Jumlah job selesai yang disimpan sebagai riwayat
+TRAINING_JOB_HISTORY = int(os.environ.get("TRAINING_JOB_HISTORY", "50"))
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+def job_elapsed(job):
+    """Lama job berjalan (detik): sampai selesai, atau sampai sekarang jika masih running"""
+    started_at = job.get('started_at')
+    if started_at is None:
+        return 0.0
+    return (job.get('finished_at') or time.time()) - started_at
+
+
+def _process_alive(pid):
+    if os.name == "nt":
+        # os.kill(pid, 0) di Windows mengirim CTRL_C_EVENT, tidak bisa dipakai untuk cek
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobStore:
+    """
+    State job training di disk (jobs/<job_id>.json).
+
+    Ditulis oleh server (submit, cancel, worker crash) dan oleh proses
+    worker (progress, hasil), selalu lewat file sementara + rename di bawah
+    satu lock, sehingga pembaca (halaman yang polling) tidak pernah melihat
+    file setengah jadi. Data split job disimpan di jobs/<job_id>/ sampai
+    job selesai.
+    """
+
+    def __init__(self, base_dir):
+        self.jobs_dir = os.path.join(base_dir, "jobs")
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        self._lock = FileLock(os.path.join(base_dir, "locks", "jobs.lock"))
+
+    def _path(self, job_id):
+        return os.path.join(self.jobs_dir, f"{job_id}.json")
+
+    def data_dir(self, job_id):
+        return os.path.join(self.jobs_dir, job_id)
+
+    def read(self, job_id):
+        try:
+            with open(self._path(job_id), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, job):
+        def write(tmp_path):
+            with open(tmp_path, 'w') as f:
+                json.dump(job, f, indent=4)
+
+        atomic_write(self._path(job['id']), write)
+
+    def create(self, job):
+        with self._lock:
+            self._write(job)
+
+    def update(self, job_id, **fields):
+        """Gabungkan fields ke state job; None jika job tidak ada"""
+        with self._lock:
+            job = self.read(job_id)
+            if job is None:
+                return None
+            job.update(fields)
+            self._write(job)
+            return job
+
+    def transition(self, job_id, from_statuses, **fields):
+        """Update job hanya jika statusnya masih salah satu from_statuses; None jika tidak"""
+        with self._lock:
+            job = self.read(job_id)
+            if job is None or job['status'] not in from_statuses:
+                return None
+            job.update(fields)
+            self._write(job)
+            return job
+
+    def list(self):
+        """Semua job, terbaru lebih dulu"""
+        jobs = []
+        for filename in os.listdir(self.jobs_dir):
+            if filename.endswith('.json'):
+                job = self.read(filename[:-len('.json')])
+                if job is not None:
+                    jobs.append(job)
+        return sorted(jobs, key=lambda job: job.get('created_at', 0), reverse=True)
+
+    def remove(self, job_id):
+        with self._lock:
+            if os.path.exists(self._path(job_id)):
+                os.remove(self._path(job_id))
+        self.remove_data(job_id)
+
+    def remove_data(self, job_id):
+        shutil.rmtree(self.data_dir(job_id), ignore_errors=True)
+
+
+def _run_job(job_id, base_dir, n_threads):
+    """Jalankan satu job training di proses worker (dengan kuota thread) dan tulis progress ke JobStore"""
+    store = JobStore(base_dir)
+    job = store.transition(job_id, ('queued',), status='running', stage='loading',
+                           started_at=time.time(), worker_pid=os.getpid())
+    if job is None:
+        # Dibatalkan sebelum worker mengambilnya
+        return None
+
+    def on_progress(stage, info):
+        # Telemetry per iterasi sudah dibatasi TrainingTelemetry (TELEMETRY_INTERVAL)
+        fields = {'stage': stage}
+        if info:
+            fields['progress'] = info
+        store.update(job_id, **fields)
+
+    try:
+        params = configure_worker_threads(job['model_name'], job['params'], n_threads)
+
+        from threadpoolctl import threadpool_limits
+        from ml.model_trainer import ModelTrainer
+        from utils.model_persistence import ModelPersistence
+
+        X_train, y_train, X_test, y_test = read_split(store.data_dir(job_id))
+        trainer = ModelTrainer()
+        trainer.persistence = ModelPersistence(base_dir=base_dir)
+        with threadpool_limits(limits=n_threads):
+            result = trainer.train_and_save(
+                X_train, y_train, X_test, y_test,
+                model_name=job['model_name'],
+                params=params,
+                save_name=job['save_name'],
+                feature_names=job.get('feature_names'),
+                progress_callback=on_progress
+            )
+    except Exception as e:
+        result = {'success': False, 'error': str(e)}
+    finally:
+        store.remove_data(job_id)
+
+    fields = {'finished_at': time.time()}
+    if result['success']:
+        fields.update({
+            'status': 'done',
+            'stage': 'done',
+            'metrics': result['metrics'],
+            'split_id': result['split_id'],
+            'training': result['training'],
+            'save_status': result['save_status'],
+            'save_message': result['save_message']
+        })
+    else:
+        fields.update({'status': 'failed', 'stage': 'failed', 'error': result['error']})
+    store.update(job_id, **fields)
+    return fields['status']
+
+
+class TrainingJobManager:
+    """
+    Antrian job training di background.
+
+    submit() menyimpan split ke disk, mencatat job sebagai 'queued' dan
+    langsung mengembalikan job ID. TrainingScheduler menentukan kapan job
+    boleh mulai (slot, kuota thread, batas memori, antrian adil antar
+    sesi); job yang diizinkan dijalankan di process pool dan hasilnya
+    disimpan lewat ModelPersistence. State job (status, tahap, waktu,
+    telemetry per iterasi, metrics) ada di JobStore sehingga halaman mana
+    pun bisa polling, dan rerun Streamlit tidak menghentikan training.
+    Satu instance per proses server.
+    """
+
+    def __init__(self, base_dir="saved_models", scheduler=None):
+        self.base_dir = base_dir
+        self.scheduler = scheduler or TrainingScheduler()
+        self.store = JobStore(base_dir)
+        self._executor = None
+        self._futures = {}
+        self._lock = threading.RLock()
+        self._recover_interrupted()
+        self._prune_history()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn: proses baru tanpa warisan thread Streamlit/TensorFlow dari parent.
+                # Hanya job yang sudah diizinkan scheduler yang dikirim ke pool.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.scheduler.slots,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _recover_interrupted(self):
+        """Job queued/running milik server yang sudah mati tidak akan pernah selesai"""
+        for job in self.store.list():
+            if job['status'] in ACTIVE_STATUSES and job.get('owner_pid') != os.getpid() \
+                    and not _process_alive(job.get('owner_pid', -1)):
+                self.store.update(job['id'], status='failed', stage='failed', finished_at=time.time(),
+                                  error="Server berhenti sebelum job selesai")
+                self.store.remove_data(job['id'])
+
+    def _prune_history(self):
+        finished = [job for job in self.store.list() if job['status'] not in ACTIVE_STATUSES]
+        for job in finished[TRAINING_JOB_HISTORY:]:
+            self.store.remove(job['id'])
+
+    def submit(self, X_train, y_train, X_test, y_test, model_name, params, save_name=None, feature_names=None,
+               owner=None):
+        """
+        Masukkan training satu model ke antrian
+
+        Args:
+            owner: ID pemilik job (sesi), dipakai untuk antrian adil
+
+        Returns:
+            Job ID
+        """
+        job_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        data_dir = self.store.data_dir(job_id)
+        os.makedirs(data_dir, exist_ok=True)
+        write_split(data_dir, X_train, y_train, X_test, y_test)
+        data_bytes = sum(os.path.getsize(os.path.join(data_dir, name)) for name in os.listdir(data_dir))
+
+        job = {
+            'id': job_id,
+            'model_name': model_name,
+            'save_name': save_name or model_name,
+            'params': params,
+            'feature_names': list(feature_names) if feature_names is not None else None,
+            'owner': owner,
+            'status': 'queued',
+            'stage': 'queued',
+            'progress': {},
+            'created_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+            'owner_pid': os.getpid()
+        }
+        with self._lock:
+            request = self.scheduler.add(job_id, owner, model_name, data_bytes)
+            job.update(threads=request['threads'], memory_mb=request['memory_mb'])
+            self.store.create(job)
+            self._dispatch()
+
+        self._prune_history()
+        return job_id
+
+    def _dispatch(self):
+        """Jalankan semua job yang diizinkan scheduler saat ini"""
+        with self._lock:
+            for request in self.scheduler.admit():
+                job_id = request['id']
+                try:
+                    future = self._get_executor().submit(_run_job, job_id, self.base_dir, request['threads'])
+                except BrokenProcessPool:
+                    # Pool rusak (worker mati): buat ulang sekali
+                    self._executor = None
+                    future = self._get_executor().submit(_run_job, job_id, self.base_dir, request['threads'])
+                self._futures[job_id] = future
+                future.add_done_callback(lambda f, job_id=job_id: self._on_done(job_id, f))
+
+    def _on_done(self, job_id, future):
+        with self._lock:
+            self._futures.pop(job_id, None)
+            self.scheduler.release(job_id)
+
+        if not future.cancelled() and future.exception() is not None:
+            # Worker mati (mis. kehabisan memori) sebelum sempat menulis hasil
+            error = future.exception()
+            if isinstance(error, BrokenProcessPool):
+                with self._lock:
+                    self._executor = None
+            job = self.store.read(job_id)
+            if job is not None and job['status'] in ACTIVE_STATUSES:
+                self.store.update(job_id, status='failed', stage='failed', finished_at=time.time(),
+                                  error=str(error) or type(error).__name__)
+            self.store.remove_data(job_id)
+
+        # Slot yang baru kosong dipakai job berikutnya
+        self._dispatch()
+
+    def cancel(self, job_id):
+        """Batalkan job yang masih queued; job yang sedang running tidak bisa dibatalkan"""
+        job = self.store.transition(job_id, ('queued',), status='cancelled', stage='cancelled',
+                                    finished_at=time.time())
+        if job is None:
+            return False
+
+        # Job yang sudah diizinkan tapi belum diambil worker akan dilewati worker
+        if self.scheduler.remove(job_id):
+            self._dispatch()
+        self.store.remove_data(job_id)
+        return True
+
+    def get(self, job_id):
+        return self.store.read(job_id)
+
+    def list_jobs(self, limit=None):
+        jobs = self.store.list()
+        return jobs[:limit] if limit else jobs
+
+    def active_count(self):
+        return sum(1 for job in self.store.list() if job['status'] in ACTIVE_STATUSES)
+
+    def queue_positions(self):
+        """Dictionary {job_id: posisi antrian} untuk job yang menunggu izin scheduler"""
+        return self.scheduler.queue_positions()
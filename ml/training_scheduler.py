@@ -0,0 +1,170 @@
+import os
+import threading
+from collections import Counter, deque
+from ml.model_registry import get_model_spec, get_model_names
+from ml.training_worker import TRAINING_CPUS
+
+
+def _default_memory_mb():
+    """Setengah RAM fisik, atau 4096 MB jika tidak bisa dibaca (mis. Windows)"""
+    try:
+        return int(os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') / (1024 * 1024) * 0.5)
+    except (AttributeError, ValueError, OSError):
+        return 4096
+
+
+def _default_job_threads():
+    """Sisa core setelah model single-thread, dibagi rata ke model multi-thread (Train All muat sekaligus)"""
+    specs = [get_model_spec(name) for name in get_model_names()]
+    parallel = sum(1 for spec in specs if spec.is_multithreaded)
+    return max(1, (TRAINING_CPUS - (len(specs) - parallel)) // max(1, parallel))
+
+
+# Batas atas jumlah proses training bersamaan di server (default satu per core),
+# admission sebenarnya diatur kuota thread dan memori
+TRAINING_SLOTS = int(os.environ.get("TRAINING_SLOTS", str(TRAINING_CPUS)))
+# Thread maksimal satu job model multi-thread
+TRAINING_JOB_THREADS = int(os.environ.get("TRAINING_JOB_THREADS", str(_default_job_threads())))
+# Batas total perkiraan memori job yang berjalan bersamaan (MB)
+TRAINING_MEMORY_MB = int(os.environ.get("TRAINING_MEMORY_MB", str(_default_memory_mb())))
+# Pengali ukuran split untuk salinan data selama training (scaling, DMatrix/Pool, tensor)
+DATA_MEMORY_FACTOR = 6
+
+
+class TrainingScheduler:
+    """
+    Admission control job training untuk seluruh proses server.
+
+    Job baru masuk antrian dan baru dijalankan jika sisa thread (kuota per
+    job) dan sisa memori (perkiraan per job) masih cukup; slot hanya batas
+    atas jumlah proses. Antrian adil antar sesi: job berikutnya diambil
+    dari pemilik dengan job berjalan paling sedikit (seri: pemilik yang
+    paling lama tidak dilayani, round-robin), FIFO dalam satu pemilik,
+    sehingga satu analis yang mengirim banyak job tidak menahan job
+    analis lain. Kepala antrian tidak dilompati walau job di belakangnya
+    lebih kecil, agar job besar tidak kelaparan. Jika tidak ada job
+    berjalan, kepala antrian selalu diizinkan.
+    """
+
+    def __init__(self, slots=None, total_threads=None, memory_mb=None, job_threads=None):
+        self.slots = max(1, slots or TRAINING_SLOTS)
+        self.total_threads = max(1, total_threads or TRAINING_CPUS)
+        self.memory_mb = memory_mb or TRAINING_MEMORY_MB
+        self.job_threads = max(1, min(job_threads or TRAINING_JOB_THREADS, self.total_threads))
+        self._pending = {}
+        self._running = {}
+        self._seq = 0
+        self._served = 0
+        self._last_served = {}
+        self._lock = threading.Lock()
+
+    def quota(self, model_name):
+        """Jumlah thread untuk satu job model ini"""
+        return self.job_threads if get_model_spec(model_name).is_multithreaded else 1
+
+    def estimate_memory_mb(self, model_name, data_bytes):
+        """Perkiraan memori proses training (MB) dari family model dan ukuran split"""
+        return int(get_model_spec(model_name).memory_mb + data_bytes * DATA_MEMORY_FACTOR / (1024 * 1024))
+
+    def add(self, job_id, owner, model_name, data_bytes):
+        """
+        Masukkan job ke antrian
+
+        Returns:
+            Dictionary request (threads, memory_mb) yang dipakai job ini
+        """
+        with self._lock:
+            self._seq += 1
+            request = {
+                'id': job_id,
+                'owner': owner,
+                'threads': self.quota(model_name),
+                'memory_mb': self.estimate_memory_mb(model_name, data_bytes),
+                'seq': self._seq
+            }
+            self._pending[job_id] = request
+            return request
+
+    def remove(self, job_id):
+        """Keluarkan job yang masih antri; False jika sudah berjalan/tidak ada"""
+        with self._lock:
+            return self._pending.pop(job_id, None) is not None
+
+    def _order(self):
+        """Request yang antri, dalam urutan akan dijalankan"""
+        running = Counter(request['owner'] for request in self._running.values())
+        last_served = dict(self._last_served)
+        queues = {}
+        for request in sorted(self._pending.values(), key=lambda r: r['seq']):
+            queues.setdefault(request['owner'], deque()).append(request)
+
+        order = []
+        served = self._served
+        while queues:
+            owner = min(queues, key=lambda o: (running[o], last_served.get(o, 0), queues[o][0]['seq']))
+            order.append(queues[owner].popleft())
+            running[owner] += 1
+            served += 1
+            last_served[owner] = served
+            if not queues[owner]:
+                del queues[owner]
+        return order
+
+    def _fits(self, request):
+        if not self._running:
+            return True
+        used = self._usage()
+        return (used['threads'] + request['threads'] <= self.total_threads
+                and used['memory_mb'] + request['memory_mb'] <= self.memory_mb
+                and used['slots'] < self.slots)
+
+    def _usage(self):
+        return {
+            'slots': len(self._running),
+            'threads': sum(request['threads'] for request in self._running.values()),
+            'memory_mb': sum(request['memory_mb'] for request in self._running.values())
+        }
+
+    def admit(self):
+        """
+        Pindahkan job dari kepala antrian ke running selama batas masih cukup
+
+        Returns:
+            List request yang boleh mulai sekarang
+        """
+        admitted = []
+        with self._lock:
+            while self._pending:
+                head = self._order()[0]
+                if not self._fits(head):
+                    break
+                del self._pending[head['id']]
+                self._running[head['id']] = head
+                self._served += 1
+                self._last_served[head['owner']] = self._served
+                admitted.append(head)
+        return admitted
+
+    def release(self, job_id):
+        """Kembalikan slot, thread dan memori job yang selesai"""
+        with self._lock:
+            self._running.pop(job_id, None)
+
+    def queue_positions(self):
+        """Dictionary {job_id: posisi antrian (mulai 1)}"""
+        with self._lock:
+            return {request['id']: position for position, request in enumerate(self._order(), start=1)}
+
+    def get_stats(self):
+        """Pemakaian slot, thread dan memori untuk ditampilkan di UI"""
+        with self._lock:
+            used = self._usage()
+            return {
+                'slots_used': used['slots'],
+                'slots': self.slots,
+                'threads_used': used['threads'],
+                'threads': self.total_threads,
+                'memory_used_mb': used['memory_mb'],
+                'memory_mb': self.memory_mb,
+                'queued': len(self._pending)
+            }
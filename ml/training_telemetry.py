@@ -0,0 +1,171 @@
+import os
+import time
+from collections import deque
+
+# Jumlah titik iterasi terakhir yang disimpan per training (ring buffer)
+TELEMETRY_POINTS = int(os.environ.get("TELEMETRY_POINTS", "500"))
+# Jeda minimal antar pengiriman telemetry ke on_update (detik)
+TELEMETRY_INTERVAL = 0.5
+# Jumlah titik terakhir untuk menghitung throughput
+_RATE_WINDOW = 20
+
+
+def boosting_iterations(family, model):
+    """Jumlah iterasi maksimal estimator booster (n_estimators / iterations), None untuk family lain"""
+    params = model.get_params()
+    if family == "xgboost":
+        return params.get('n_estimators') or 100
+    if family == "catboost":
+        return params.get('iterations') or params.get('n_estimators') or params.get('num_boost_round') or 1000
+    return None
+
+
+def _float_metrics(metrics):
+    return {name: float(value) for name, value in (metrics or {}).items()}
+
+
+class _CatBoostCallback:
+    """Callback CatBoost (fit(callbacks=[...])): metrics dibaca dari memori, bukan catboost_info/"""
+
+    def __init__(self, telemetry):
+        self.telemetry = telemetry
+
+    def after_iteration(self, info):
+        metrics = {}
+        for data_name, values in info.metrics.items():
+            prefix = "" if data_name == "learn" else "val_"
+            for metric_name, history in values.items():
+                if history:
+                    metrics[f"{prefix}loss"] = history[-1]
+                    self.telemetry.metric_name = metric_name
+        self.telemetry.record(info.iteration, metrics)
+        return True
+
+
+class TrainingTelemetry:
+    """
+    Telemetry per iterasi (boosting round / epoch) satu training.
+
+    Setiap iterasi dicatat ke ring buffer berukuran tetap (iteration,
+    elapsed, loss/val_loss), lengkap dengan throughput dan ETA, lalu
+    ringkasannya dikirim ke on_update paling sering setiap
+    TELEMETRY_INTERVAL detik. Callback XGBoost, CatBoost dan Keras semua
+    menulis ke sini dengan nama metrik yang sama: 'loss' untuk data
+    training dan 'val_loss' untuk data validasi.
+    """
+
+    def __init__(self, total=None, capacity=None, on_update=None):
+        """
+        Args:
+            total: Jumlah iterasi maksimal (untuk ETA), None jika tidak diketahui
+            capacity: Ukuran ring buffer (default TELEMETRY_POINTS)
+            on_update: Fungsi on_update(summary) yang menerima ringkasan telemetry
+        """
+        self.total = total
+        self.points = deque(maxlen=capacity or TELEMETRY_POINTS)
+        self.on_update = on_update
+        self.metric_name = None
+        self._start = time.perf_counter()
+        self._last_update = 0.0
+
+    def record(self, iteration, metrics=None):
+        """Catat satu iterasi (iteration mulai 1)"""
+        point = {'iteration': int(iteration), 'elapsed': time.perf_counter() - self._start}
+        point.update(_float_metrics(metrics))
+        self.points.append(point)
+
+        now = time.perf_counter()
+        if self.on_update is not None and now - self._last_update >= TELEMETRY_INTERVAL:
+            self._last_update = now
+            self.on_update(self.summary())
+
+    def flush(self):
+        """Kirim ringkasan terakhir (dipanggil setelah training selesai)"""
+        if self.on_update is not None and self.points:
+            self.on_update(self.summary())
+
+    def throughput(self):
+        """Iterasi per detik dari beberapa titik terakhir"""
+        if not self.points:
+            return None
+        window = list(self.points)[-_RATE_WINDOW:]
+        first, last = window[0], window[-1]
+        if len(window) == 1:
+            first = {'iteration': 0, 'elapsed': 0.0}
+        seconds = last['elapsed'] - first['elapsed']
+        if seconds <= 0:
+            return None
+        return (last['iteration'] - first['iteration']) / seconds
+
+    def summary(self):
+        """
+        Ringkasan yang aman di-JSON-kan
+
+        Returns:
+            Dictionary berisi iteration, total, metrics (iterasi terakhir),
+            metric_name, it_per_sec, eta_seconds, elapsed dan history (isi ring buffer)
+        """
+        last = self.points[-1] if self.points else {'iteration': 0, 'elapsed': 0.0}
+        rate = self.throughput()
+        eta = None
+        if rate and self.total:
+            eta = max(self.total - last['iteration'], 0) / rate
+        return {
+            'iteration': last['iteration'],
+            'total': self.total,
+            'metrics': {key: value for key, value in last.items() if key not in ('iteration', 'elapsed')},
+            'metric_name': self.metric_name,
+            'it_per_sec': rate,
+            'eta_seconds': eta,
+            'elapsed': last['elapsed'],
+            'history': list(self.points)
+        }
+
+    def keras_callback(self):
+        """Callback Keras: satu titik per epoch (loss, val_loss dari logs)"""
+        from keras.callbacks import LambdaCallback
+        return LambdaCallback(on_epoch_end=lambda epoch, logs: self.record(epoch + 1, logs))
+
+    def xgboost_callback(self):
+        """Callback XGBoost: satu titik per boosting round (eval_set pertama = loss, berikutnya = val_loss)"""
+        from xgboost.callback import TrainingCallback
+        telemetry = self
+
+        class XGBoostTelemetry(TrainingCallback):
+            def after_iteration(self, model, epoch, evals_log):
+                metrics = {}
+                for index, values in enumerate(evals_log.values()):
+                    for metric_name, history in values.items():
+                        metrics["loss" if index == 0 else "val_loss"] = history[-1]
+                        telemetry.metric_name = metric_name
+                telemetry.record(epoch + 1, metrics)
+                return False
+
+        return XGBoostTelemetry()
+
+    def catboost_callback(self):
+        return _CatBoostCallback(self)
+
+    def attach(self, family, model, X_train, y_train):
+        """
+        Pasang callback ke estimator sebelum fit
+
+        Returns:
+            Dictionary argumen tambahan untuk model.fit (kosong untuk family
+            tanpa callback per iterasi)
+        """
+        if family == "xgboost":
+            self.total = boosting_iterations(family, model)
+            model.set_params(callbacks=[self.xgboost_callback()])
+            # eval_set yang sama dengan data training memakai ulang DMatrix (dan cache prediksinya)
+            return {'eval_set': [(X_train, y_train)], 'verbose': False}
+        if family == "catboost":
+            self.total = boosting_iterations(family, model)
+            return {'callbacks': [self.catboost_callback()]}
+        return {}
+
+    def detach(self, family, model):
+        """Lepas callback dari estimator setelah fit (agar model bisa di-pickle dan disimpan)"""
+        if family == "xgboost":
+            model.set_params(callbacks=None)
+        self.flush()
@@ -0,0 +1,64 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+from ml.model_registry import get_model_spec
+
+# Jumlah core yang boleh dipakai training paralel, bisa diatur lewat environment variable
+TRAINING_CPUS = int(os.environ.get("TRAINING_CPUS", str(os.cpu_count() or 1)))
+
+# Variabel environment yang dibaca OpenMP/BLAS saat library di-import
+_THREAD_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "TF_NUM_INTRAOP_THREADS")
+
+
+def write_split(data_dir, X_train, y_train, X_test, y_test):
+    """Simpan split ke .npy agar worker memuatnya dengan memory-map (tanpa pickle per proses)"""
+    for name, values in (('X_train', X_train), ('y_train', y_train), ('X_test', X_test), ('y_test', y_test)):
+        np.save(os.path.join(data_dir, f"{name}.npy"), np.asarray(values), allow_pickle=False)
+
+    info = {
+        'columns': [str(col) for col in X_train.columns] if hasattr(X_train, 'columns') else None,
+        'target': str(y_train.name) if getattr(y_train, 'name', None) is not None else None
+    }
+    with open(os.path.join(data_dir, 'split.json'), 'w') as f:
+        json.dump(info, f)
+
+
+def read_split(data_dir):
+    """Muat split hasil write_split (memory-map) sebagai DataFrame/Series"""
+    with open(os.path.join(data_dir, 'split.json'), 'r') as f:
+        info = json.load(f)
+
+    def load(name):
+        return np.load(os.path.join(data_dir, f"{name}.npy"), mmap_mode='r', allow_pickle=False)
+
+    X_train = pd.DataFrame(load('X_train'), columns=info['columns'])
+    X_test = pd.DataFrame(load('X_test'), columns=info['columns'])
+    y_train = pd.Series(load('y_train'), name=info['target'])
+    y_test = pd.Series(load('y_test'), name=info['target'])
+    return X_train, y_train, X_test, y_test
+
+
+def configure_worker_threads(model_name, params, n_threads):
+    """
+    Batasi thread proses worker sebelum training
+
+    Harus dipanggil sebelum library model di-import di proses ini. BLAS/OpenMP
+    milik numpy yang sudah dimuat dibatasi terpisah lewat threadpool_limits.
+
+    Returns:
+        Salinan params dengan parameter thread estimator diisi n_threads
+    """
+    # Untuk library yang baru di-import setelah ini (xgboost, catboost, TensorFlow)
+    for var in _THREAD_ENV_VARS:
+        os.environ[var] = str(n_threads)
+
+    spec = get_model_spec(model_name)
+    params = dict(params)
+    if spec.thread_param:
+        params[spec.thread_param] = n_threads
+    if spec.family == "keras":
+        import tensorflow as tf
+        tf.config.threading.set_intra_op_parallelism_threads(n_threads)
+        tf.config.threading.set_inter_op_parallelism_threads(1)
+    return params
@@ -69,7 +69,7 @@ def show():
     with col1:
         st.markdown("""
         #### 📂 Data Management
-        - Upload file Excel (.xlsx)
+        - Upload file Excel (.xlsx), CSV, Parquet atau Feather
         - Automatic batch processing (48 rows per batch)
         - Feature averaging per batch
         - Data preview and validation
@@ -321,6 +321,10 @@ def show():
             pred1 = model1_data["predictions"]["y_pred"]
             pred2 = model2_data["predictions"]["y_pred"]
             y_test = model1_data["predictions"]["y_test"]
+            split1 = model1_data["predictions"].get("split_id")
+            split2 = model2_data["predictions"].get("split_id")
+            if split1 and split2 and split1 != split2:
+                st.warning(f"⚠️ {model1} dan {model2} dievaluasi pada data test yang berbeda; nilai aktual diambil dari {model1}.")
             
             # Take first 50 points for visualization
             n_points = min(50, len(pred1))
@@ -17,7 +17,7 @@ def show():
 
         Aplikasi ini dirancang untuk membantu Anda:
         
-        -**Upload Data**: Mengunggah file Excel dengan data batch
+        -**Upload Data**: Mengunggah file Excel, CSV, Parquet atau Feather dengan data batch
         -**Train Model**: Melatih berbagai model Machine Learning
         -**Visualisasi**: Melihat hasil prediksi dalam bentuk grafik
         -**Analisis**: Menganalisis kontribusi setiap fitur
@@ -1,43 +1,195 @@
 import streamlit as st
 import pandas as pd
-from ml.model_trainer import ModelTrainer, prepare_batch_data, split_data
-from utils.session_manager import save_model_results
+from ml.model_trainer import ModelTrainer, split_data
+from ml.model_registry import get_model_names
+from ml.data_loader import SUPPORTED_FORMATS
+from utils.data_cache import get_file_hash, load_dataset, get_batch_features, get_streamed_features
+from utils.session_manager import get_training_job_manager
+from ml.training_jobs import ACTIVE_STATUSES, job_elapsed
+
+JOB_STATUS_LABELS = {
+    'queued': "🕒 Antri",
+    'running': "⏳ Berjalan",
+    'done': "✅ Selesai",
+    'failed': "❌ Gagal",
+    'cancelled': "🚫 Dibatalkan"
+}
+
+def show_loss_chart(progress):
+    """Grafik loss/val_loss per iterasi dari history telemetry job"""
+    history = pd.DataFrame(progress.get('history') or [])
+    loss_columns = [col for col in ('loss', 'val_loss') if col in history.columns]
+    if loss_columns:
+        st.line_chart(history.set_index('iteration')[loss_columns], height=200)
+
+def show_training_jobs():
+    """Tabel job training background, di-polling selama masih ada job berjalan"""
+    manager = get_training_job_manager()
+    polling = manager.active_count() > 0
+    
+    @st.fragment(run_every=2 if polling else None)
+    def jobs_panel():
+        jobs = manager.list_jobs(limit=10)
+        if not jobs:
+            return
+        active = [job for job in jobs if job['status'] in ACTIVE_STATUSES]
+        if polling and not active:
+            # Semua job selesai: rerun seluruh halaman (hentikan polling, tampilkan hasil)
+            st.rerun()
+        
+        st.markdown("#### 🗂️ Training Jobs")
+        stats = manager.scheduler.get_stats()
+        st.caption(
+            f"🎛️ Slot {stats['slots_used']}/{stats['slots']} | "
+            f"Thread {stats['threads_used']}/{stats['threads']} | "
+            f"Memori ~{stats['memory_used_mb']}/{stats['memory_mb']} MB | "
+            f"Antrian {stats['queued']}"
+        )
+        
+        positions = manager.queue_positions()
+        for job in active:
+            progress = job.get('progress') or {}
+            label = f"{job['save_name']}: {job['stage']} ({job_elapsed(job):.0f}s)"
+            if progress.get('iteration'):
+                # Telemetry per iterasi (XGBoost, CatBoost, LSTM)
+                metrics = progress.get('metrics', {})
+                details = [f"iterasi {progress['iteration']}/{progress.get('total') or '?'}"]
+                if 'loss' in metrics:
+                    details.append(f"{progress.get('metric_name') or 'loss'} {metrics['loss']:.4f}")
+                if progress.get('it_per_sec'):
+                    details.append(f"{progress['it_per_sec']:.1f} it/s")
+                if progress.get('eta_seconds') is not None:
+                    details.append(f"ETA {progress['eta_seconds']:.0f}s")
+                fraction = min(progress['iteration'] / progress['total'], 1.0) if progress.get('total') else 0.0
+                st.progress(fraction, text=f"{label} | " + " | ".join(details))
+                show_loss_chart(progress)
+            elif job['id'] in positions:
+                st.caption(f"{JOB_STATUS_LABELS['queued']} #{positions[job['id']]}: {job['save_name']} "
+                           f"({job.get('threads')} thread, ~{job.get('memory_mb')} MB)")
+            else:
+                st.caption(f"{JOB_STATUS_LABELS[job['status']]} {label}")
+            
+            if job['status'] == 'queued' and job['id'] in st.session_state.training_jobs:
+                if st.button(f"Batalkan {job['save_name']}", key=f"cancel_{job['id']}"):
+                    manager.cancel(job['id'])
+        
+        rows = []
+        for job in jobs:
+            metrics = job.get('metrics') or {}
+            rows.append({
+                'Job': job['id'],
+                'Model': job['save_name'],
+                'Status': JOB_STATUS_LABELS.get(job['status'], job['status']),
+                'Thread': job.get('threads'),
+                'Waktu (s)': round(job_elapsed(job), 1),
+                'MAE': metrics.get('MAE'),
+                'RMSE': metrics.get('RMSE'),
+                'R2': metrics.get('R2'),
+                'Error': job.get('error')
+            })
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+    
+    jobs_panel()
 
 def show():
     """Display Model Training page"""
     st.title("Train Model")
-    st.markdown("Upload file Excel dan latih model Machine Learning pilihan Anda.")
+    st.markdown("Upload dataset (Excel, CSV, Parquet atau Feather) dan latih model Machine Learning pilihan Anda.")
 
     # Model info
     current_model = st.session_state.get("selected_ml_model", "Linear Regression")
     st.info(f"Model yang akan dilatih: **{current_model}**")
 
     # File uploader
-    uploaded_file = st.file_uploader("📂 Upload file Excel", type=["xlsx"])
+    uploaded_file = st.file_uploader("📂 Upload dataset", type=SUPPORTED_FORMATS)
 
     if uploaded_file:
         try:
-            # Load data
-            data = pd.read_excel(uploaded_file)
-            st.success(f"✅ Data berhasil diunggah! Jumlah baris: {len(data)}")
+            file_hash = get_file_hash(uploaded_file)
             
-            # Save raw data
-            st.session_state.raw_data = data
+            streaming = st.checkbox(
+                "🌊 Mode streaming (file besar)",
+                help="Data dibaca per potongan dan langsung diubah menjadi fitur batch, tanpa menyimpan DataFrame mentah di memori."
+            )
+            
+            if streaming:
+                data = None
+                st.session_state.raw_data = None
+                st.info("Mode streaming aktif: data mentah tidak dimuat ke memori, preview dan mode fitur cepat tidak tersedia.")
+            else:
+                # Load data (di-memoize per hash isi file, rerun widget tidak parse ulang)
+                data, load_stats = load_dataset(file_hash, uploaded_file.getvalue(), uploaded_file.name)
+                st.success(f"✅ Data berhasil diunggah! Jumlah baris: {len(data)}")
+                
+                source_label = "salinan Parquet (hasil konversi xlsx)" if load_stats['source'] == "parquet-cache" else load_stats['format'].upper()
+                peak_label = "n/a" if load_stats['peak_memory_mb'] is None else f"{load_stats['peak_memory_mb']:.1f} MB"
+                st.caption(
+                    f"⏱️ Parsing {source_label}: {load_stats['parse_seconds']:.2f} s | "
+                    f"Peak memori: {peak_label} | "
+                    f"DataFrame: {load_stats['frame_memory_mb']:.1f} MB | "
+                    f"File: {load_stats['file_size_mb']:.1f} MB"
+                )
+                
+                # Save raw data
+                st.session_state.raw_data = data
 
-            # Show data preview
-            with st.expander("Preview Data (48 baris pertama)", expanded=False):
-                st.dataframe(data.head(48), use_container_width=True)
+                # Show data preview
+                with st.expander("Preview Data (48 baris pertama)", expanded=False):
+                    st.dataframe(data.head(48), use_container_width=True)
 
             st.markdown("---")
 
             # Prepare batch data
             st.markdown("### 🔄 Preprocessing Data")
             
+            col1, col2 = st.columns(2)
+            with col1:
+                batch_size = st.select_slider("Batch Size", options=[24, 48, 96], value=48)
+            
+            if streaming:
+                # Streaming hanya mendukung batch tidak overlap dengan fitur lengkap
+                stride = batch_size
+                feature_mode = "Lengkap"
+            else:
+                with col2:
+                    stride = st.select_slider(
+                        "Stride Window",
+                        options=sorted({1, 6, 12, batch_size // 2, batch_size}),
+                        value=batch_size,
+                        help=f"{batch_size} = batch tidak overlap. Nilai lebih kecil membuat sliding window overlap (lebih banyak sampel)."
+                    )
+                if stride < batch_size:
+                    st.caption("💡 Window overlap: sampel yang berdekatan saling berbagi baris, sehingga split acak dapat membuat metrik test terlalu optimis.")
+                
+                feature_mode = st.radio(
+                    "Mode Fitur",
+                    ["Lengkap", "Cepat (prefix-sum)"],
+                    horizontal=True,
+                    help="Mode cepat hanya memakai mean, std, posisi, trend dan segmen, dihitung dari index kumulatif tanpa memindai ulang data."
+                )
+                if feature_mode != "Lengkap":
+                    n_segments = st.slider("Jumlah Segmen", 2, 6, 3)
+            
             with st.spinner("Memproses data menjadi batch..."):
-                X, y, selected_features = prepare_batch_data(data, batch_size=48)
+                if feature_mode == "Lengkap":
+                    feature_options = {"mode": "full", "batch_size": batch_size, "stride": stride}
+                else:
+                    feature_options = {"mode": "prefix", "batch_size": batch_size, "stride": stride, "n_segments": n_segments}
+                
+                if streaming:
+                    X, y, selected_features, from_cache = get_streamed_features(
+                        file_hash, uploaded_file, st.session_state.feature_store,
+                        file_name=uploaded_file.name, batch_size=batch_size
+                    )
+                else:
+                    X, y, selected_features, from_cache = get_batch_features(
+                        file_hash, data, st.session_state.feature_store, **feature_options
+                    )
                 st.session_state.selected_features = selected_features
             
             st.success(f"✅ Data berhasil diproses menjadi {len(X)} batch!")
+            if from_cache:
+                st.caption("⚡ Fitur dimuat dari feature store (dataset dan opsi yang sama pernah diproses).")
 
             # Split data
             st.markdown("---")
@@ -79,7 +231,7 @@ def show():
             with col3:
                 if st.button("🗑️ Clear All Models", use_container_width=True):
                     # Clear from session
-                    st.session_state.trained_models = {}
+                    st.session_state.trained_models.clear()
                     # Clear from disk
                     if 'model_persistence' in st.session_state:
                         success, message = st.session_state.model_persistence.clear_all_saved_models()
@@ -91,97 +243,124 @@ def show():
                         st.warning("Model persistence not initialized")
                     st.rerun()
 
-            # Training process
+            # Training process: dijalankan sebagai job background, halaman tetap bisa dipakai
             if train_button:
-                with st.spinner(f"Training {current_model}..."):
-                    try:
-                        # 🔴 PERBAIKAN 1: Gunakan trainer dari session_state atau buat baru
-                        if 'trainer' not in st.session_state:
-                            st.session_state.trainer = ModelTrainer()
-                        
-                        trainer = st.session_state.trainer
-                        
-                        # Get parameters
-                        params = st.session_state.get("model_params", {})
-                        
-                        # 🔴 PERBAIKAN 2: Gunakan train_and_save() untuk auto-save
-                        result = trainer.train_and_save(
+                if 'trainer' not in st.session_state:
+                    st.session_state.trainer = ModelTrainer()
+                
+                job_id = get_training_job_manager().submit(
+                    X_train, y_train, X_test, y_test,
+                    model_name=current_model,
+                    params=st.session_state.get("model_params", {}),
+                    save_name=current_model,  # Nama untuk disimpan
+                    feature_names=selected_features,
+                    owner=st.session_state.session_id
+                )
+                st.session_state.training_jobs.append(job_id)
+                st.rerun()
+            
+            show_training_jobs()
+            
+            # Hasil job training terakhir sesi ini
+            last_job = st.session_state.get("last_training_job")
+            if last_job is not None:
+                if last_job['status'] == 'done':
+                    metrics = last_job['metrics']
+                    
+                    # Show save status
+                    if last_job['save_status']:
+                        st.success(f"✅ Model {last_job['save_name']} berhasil dilatih dan disimpan ke disk! ({job_elapsed(last_job):.1f}s)")
+                        st.caption(last_job['save_message'])
+                    else:
+                        st.warning(f"⚠️ Model berhasil dilatih tapi gagal disimpan: {last_job['save_message']}")
+
+                    training = last_job.get('training')
+                    if training:
+                        st.caption(
+                            f"⏹️ Early stopping: model disimpan dengan {training['n_iterations']} dari "
+                            f"{training['max_iterations']} iterasi ({training['iterations_run']} dijalankan, "
+                            f"val {training['metric']} terbaik {training['best_score']:.4f})"
+                        )
+
+                    # Display metrics
+                    st.markdown("---")
+                    st.markdown("### 📈 Hasil Evaluasi Model")
+                    
+                    # Metrics in columns
+                    col1, col2, col3, col4, col5 = st.columns(5)
+                    
+                    with col1:
+                        st.metric("MAE", f"{metrics['MAE']:.4f}")
+                    with col2:
+                        st.metric("MSE", f"{metrics['MSE']:.4f}")
+                    with col3:
+                        st.metric("RMSE", f"{metrics['RMSE']:.4f}")
+                    with col4:
+                        st.metric("MAPE", f"{metrics['MAPE']:.2f}%")
+                    with col5:
+                        st.metric("R² Score", f"{metrics['R2']:.4f}")
+                    
+                    # Detailed metrics
+                    with st.expander("📊 Detail Metrik Evaluasi", expanded=True):
+                        st.markdown(f"""
+                        <div style='background: #F0FDF4; padding: 1.5rem; border-radius: 8px; border: 2px solid #A7F3D0;'>
+                            <p><b>Mean Absolute Error (MAE):</b> {metrics['MAE']:.4f}</p>
+                            <p><b>Mean Squared Error (MSE):</b> {metrics['MSE']:.4f}</p>
+                            <p><b>Root Mean Squared Error (RMSE):</b> {metrics['RMSE']:.4f}</p>
+                            <p><b>Mean Absolute Percentage Error (MAPE):</b> {metrics['MAPE']:.2f}%</p>
+                            <p><b>R² Score:</b> {metrics['R2']:.4f}</p>
+                            <hr style='margin: 1rem 0; border-color: #A7F3D0;'>
+                            <p style='font-size: 14px; color: #6B7280;'><i>
+                            MAE mengukur rata-rata kesalahan absolut. Semakin kecil semakin baik.<br>
+                            R² Score mengukur seberapa baik model menjelaskan variasi data (0-1, semakin tinggi semakin baik).
+                            </i></p>
+                        </div>
+                        """, unsafe_allow_html=True)
+                    
+                    if (last_job.get('progress') or {}).get('history'):
+                        with st.expander("📉 Kurva Loss Training", expanded=False):
+                            show_loss_chart(last_job['progress'])
+                    
+                    st.info("💡 Lihat visualisasi lengkap di halaman **Analisis** dan bandingkan dengan model lain di **Perbandingan**")
+                
+                elif last_job['status'] == 'failed':
+                    st.error(f"❌ Error saat training model {last_job['save_name']}: {last_job.get('error')}")
+
+            # Train all models (paralel, satu proses per model)
+            with st.expander("🚀 Train All Models (paralel)"):
+                selected_models = st.multiselect(
+                    "Model yang dilatih:",
+                    get_model_names(),
+                    default=get_model_names(),
+                    key="train_all_models"
+                )
+                params_by_model = st.session_state.get("model_params_by_model", {})
+                scheduler = get_training_job_manager().scheduler
+                if selected_models:
+                    st.caption(
+                        f"🧵 Kuota thread per job: "
+                        + ", ".join(f"{name} {scheduler.quota(name)}" for name in selected_models)
+                        + f" | Maks. {scheduler.total_threads} thread bersamaan di server"
+                        + " | Model tanpa parameter dari sidebar memakai default."
+                    )
+                
+                if st.button("🚀 Train All", disabled=not selected_models, use_container_width=True):
+                    if 'trainer' not in st.session_state:
+                        st.session_state.trainer = ModelTrainer()
+                    
+                    # Satu job per model lewat antrian server (admission control yang sama)
+                    manager = get_training_job_manager()
+                    for name in selected_models:
+                        job_id = manager.submit(
                             X_train, y_train, X_test, y_test,
-                            model_name=current_model,
-                            params=params,
-                            save_name=current_model,  # Nama untuk disimpan
-                            feature_names=selected_features
+                            model_name=name,
+                            params=params_by_model.get(name, {}),
+                            save_name=name,
+                            feature_names=selected_features,
+                            owner=st.session_state.session_id
                         )
-                        
-                        if result['success']:
-                            # Extract data dari result
-                            metrics = result['metrics']
-                            y_pred = result['y_pred']
-                            feature_importance = result['feature_importance']
-                            
-                            # Save to session state juga (untuk compatibility)
-                            save_model_results(
-                                current_model,
-                                trainer.model,  # Model object
-                                metrics,
-                                {
-                                    "y_pred": y_pred,
-                                    "y_test": y_test,
-                                    "feature_importance": feature_importance
-                                }
-                            )
-                            
-                            # Show save status
-                            if result['save_status']:
-                                st.success(f"✅ Model {current_model} berhasil dilatih dan disimpan ke disk!")
-                                st.caption(result['save_message'])
-                            else:
-                                st.warning(f"⚠️ Model berhasil dilatih tapi gagal disimpan: {result['save_message']}")
-                            
-                            # Display metrics
-                            st.markdown("---")
-                            st.markdown("### 📈 Hasil Evaluasi Model")
-                            
-                            # Metrics in columns
-                            col1, col2, col3, col4, col5 = st.columns(5)
-                            
-                            with col1:
-                                st.metric("MAE", f"{metrics['MAE']:.4f}")
-                            with col2:
-                                st.metric("MSE", f"{metrics['MSE']:.4f}")
-                            with col3:
-                                st.metric("RMSE", f"{metrics['RMSE']:.4f}")
-                            with col4:
-                                st.metric("MAPE", f"{metrics['MAPE']:.2f}%")
-                            with col5:
-                                st.metric("R² Score", f"{metrics['R2']:.4f}")
-                            
-                            # Detailed metrics
-                            with st.expander("📊 Detail Metrik Evaluasi", expanded=True):
-                                st.markdown(f"""
-                                <div style='background: #F0FDF4; padding: 1.5rem; border-radius: 8px; border: 2px solid #A7F3D0;'>
-                                    <p><b>Mean Absolute Error (MAE):</b> {metrics['MAE']:.4f}</p>
-                                    <p><b>Mean Squared Error (MSE):</b> {metrics['MSE']:.4f}</p>
-                                    <p><b>Root Mean Squared Error (RMSE):</b> {metrics['RMSE']:.4f}</p>
-                                    <p><b>Mean Absolute Percentage Error (MAPE):</b> {metrics['MAPE']:.2f}%</p>
-                                    <p><b>R² Score:</b> {metrics['R2']:.4f}</p>
-                                    <hr style='margin: 1rem 0; border-color: #A7F3D0;'>
-                                    <p style='font-size: 14px; color: #6B7280;'><i>
-                                    MAE mengukur rata-rata kesalahan absolut. Semakin kecil semakin baik.<br>
-                                    R² Score mengukur seberapa baik model menjelaskan variasi data (0-1, semakin tinggi semakin baik).
-                                    </i></p>
-                                </div>
-                                """, unsafe_allow_html=True)
-                            
-                            st.info("💡 Lihat visualisasi lengkap di halaman **Analisis** dan bandingkan dengan model lain di **Perbandingan**")
-                        
-                        else:
-                            st.error(f"❌ Error saat training model: {result['error']}")
-                        
-                    except Exception as e:
-                        st.error(f"❌ Error saat training model: {str(e)}")
-                        import traceback
-                        st.code(traceback.format_exc())
+                        st.session_state.training_jobs.append(job_id)
+                    st.rerun()
 
             # Show trained models
             st.markdown("---")
@@ -212,17 +391,10 @@ def show():
                 st.markdown("#### Models in Memory")
             with col2:
                 if st.button("📂 Load from Disk"):
-                    if 'trainer' in st.session_state:
-                        saved_models = st.session_state.trainer.list_saved_models()
-                        for model_info in saved_models:
-                            if model_info['name'] not in trained_models:
-                                # Load model
-                                loaded = st.session_state.trainer.load_saved_model(model_info['name'])
-                                if loaded:
-                                    # Add to session state
-                                    st.session_state.trained_models[model_info['name']] = loaded
-                        st.success("Models loaded from disk!")
-                        st.rerun()
+                    # Daftarkan sebagai lazy handle, object model dimuat saat dipakai
+                    st.session_state.model_persistence.load_all_models()
+                    st.success("Models loaded from disk!")
+                    st.rerun()
             
             if trained_models:
                 for model_name, model_data in trained_models.items():
@@ -267,7 +439,7 @@ def show():
 
         except Exception as e:
             st.error(f"❌ Error saat memproses file: {str(e)}")
-            st.info("Pastikan file Excel Anda memiliki format yang benar dengan kolom yang diperlukan.")
+            st.info("Pastikan file Anda memiliki format yang benar dengan kolom yang diperlukan.")
             
             # Show traceback for debugging
             with st.expander("🔍 Debug Info"):
@@ -275,7 +447,10 @@ def show():
                 st.code(traceback.format_exc())
 
     else:
-        st.warning("⚠️ Silakan upload file Excel terlebih dahulu!")
+        st.warning("⚠️ Silakan upload dataset terlebih dahulu!")
+        
+        # Job yang dikirim sebelumnya tetap berjalan walau file upload sudah hilang
+        show_training_jobs()
         
         # Show available models on disk (jika ada)
         if 'trainer' in st.session_state:
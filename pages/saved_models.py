@@ -1,5 +1,8 @@
+import os
 import streamlit as st
 import pandas as pd
+from utils.model_persistence import LazyModelEntry
+from utils.data_cache import get_batch_features, get_streamed_features
 
 def show():
     """Display Saved Models Management page"""
@@ -38,6 +41,40 @@ def show():
         </div>
         """, unsafe_allow_html=True)
     
+    if persistence.model_cache is not None:
+        cache_stats = persistence.model_cache.get_stats()
+        st.caption(
+            f"🧠 Shared model cache: {cache_stats['entries']} model ({cache_stats['in_use']} dipakai sesi), "
+            f"{cache_stats['used_mb']} / {cache_stats['budget_mb']} MB | "
+            f"hit {cache_stats['hits']} / miss {cache_stats['misses']}"
+        )
+    
+    trained_models = st.session_state.trained_models
+    if hasattr(trained_models, 'get_stats'):
+        session_stats = trained_models.get_stats()
+        st.caption(
+            f"📦 Memori sesi: {session_stats['in_memory']}/{session_stats['entries']} model dimuat, "
+            f"{session_stats['used_mb']} / {session_stats['budget_mb']} MB | "
+            f"dilepas ke disk {session_stats['evictions']}x"
+        )
+    
+    feature_store = st.session_state.get("feature_store")
+    if feature_store is not None:
+        feature_info = feature_store.get_storage_info()
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            st.caption(
+                f"🧮 Feature store: {feature_info['entry_count']} entry, "
+                f"{feature_info['total_size_mb']} / {feature_info['budget_mb']} MB (entry terlama dihapus otomatis)"
+            )
+        with col2:
+            if st.button("🧹 Clear Feature Cache", use_container_width=True):
+                feature_store.clear()
+                # Matriks fitur yang di-memoize di memori ikut dilepas
+                get_batch_features.clear()
+                get_streamed_features.clear()
+                st.rerun()
+    
     st.markdown("---")
     
     # List saved models
@@ -69,14 +106,26 @@ def show():
     
     with col1:
         if st.button("🔄 Reload All Models", use_container_width=True, type="primary"):
-            with st.spinner("Memuat models dari disk..."):
-                loaded, total = persistence.load_all_models()
-                st.success(f"✅ {loaded}/{total} model(s) berhasil dimuat!")
+            loaded, total = persistence.load_all_models()
+            
+            # Muat object model secara paralel, progress per model
+            progress = st.progress(0.0, text="Memuat models dari disk...")
+            report = persistence.preload_models(
+                st.session_state.trained_models,
+                progress_callback=lambda done, n, name, error: progress.progress(done / n, text=f"Memuat {name} ({done}/{n})")
+            )
+            progress.empty()
+            
+            if report['failed']:
+                for name, error in report['failed'].items():
+                    st.error(f"❌ Model '{name}' gagal dimuat: {error}")
+            else:
+                st.success(f"✅ {loaded}/{total} model(s) berhasil dimuat! ({report['seconds']:.2f}s)")
                 st.rerun()
     
     with col2:
         if st.button("🗑️ Clear Memory Only", use_container_width=True):
-            st.session_state.trained_models = {}
+            st.session_state.trained_models.clear()
             st.success("✅ Models cleared from memory (still saved on disk)")
             st.rerun()
     
@@ -84,7 +133,7 @@ def show():
         if st.button("💣 Delete All from Disk", use_container_width=True):
             if st.session_state.get("confirm_delete", False):
                 # Confirm and delete
-                st.session_state.trained_models = {}
+                st.session_state.trained_models.clear()
                 success, message = persistence.clear_all_saved_models()
                 if success:
                     st.success(message)
@@ -116,10 +165,30 @@ def show():
             with col1:
                 st.markdown("#### Model Details")
                 st.write(f"**Name:** {model_info['name']}")
+                if model_info.get('version'):
+                    st.write(f"**Version:** {model_info['version']}")
                 st.write(f"**Saved At:** {model_info['saved_at']}")
                 st.write(f"**MAE:** {model_info['metrics']['MAE']:.4f}")
                 st.write(f"**RMSE:** {model_info['metrics']['RMSE']:.4f}")
                 st.write(f"**R² Score:** {model_info['metrics']['R2']:.4f}")
+                
+                serialization = model_info.get('serialization')
+                if serialization:
+                    size_mb = serialization['size_bytes'] / (1024 * 1024)
+                    file_name = os.path.basename(serialization.get('blob') or serialization['file'])
+                    st.write(f"**Format:** {serialization['format']} (`{file_name}`, {size_mb:.2f} MB)")
+                    if serialization.get('compression_ratio'):
+                        st.write(f"**Compression Ratio:** {serialization['compression_ratio']:.2f}x vs pickle")
+                    if serialization.get('load_seconds') is not None:
+                        st.write(f"**Load Time:** {serialization['load_seconds']:.3f} s")
+                
+                training = model_info.get('training')
+                if training:
+                    stop_label = "early stopping" if training['early_stopped'] else "tanpa berhenti lebih awal"
+                    st.write(
+                        f"**Best Iteration:** {training['n_iterations']} / {training['max_iterations']} "
+                        f"({stop_label}, val {training['metric']} {training['best_score']:.4f})"
+                    )
             
             with col2:
                 st.markdown("#### ⚙️ Actions")
@@ -128,7 +197,11 @@ def show():
                 is_loaded = selected_model in st.session_state.trained_models
                 
                 if is_loaded:
-                    st.success("✅ Model loaded in memory")
+                    entry = st.session_state.trained_models[selected_model]
+                    if isinstance(entry, LazyModelEntry) and not entry.is_loaded('model'):
+                        st.success("✅ Model terdaftar (object model dimuat saat pertama dipakai)")
+                    else:
+                        st.success("✅ Model loaded in memory")
                 else:
                     if st.button("📥 Load to Memory", key=f"load_{selected_model}"):
                         model_data = persistence.load_model(selected_model)
@@ -153,6 +226,40 @@ def show():
                     else:
                         st.error(message)
                     st.rerun()
+            
+            # Riwayat versi (artefak identik antar versi hanya disimpan sekali)
+            versions = persistence.list_versions(selected_model)
+            if len(versions) > 1:
+                with st.expander(f"🕘 Version History ({len(versions)} versi)"):
+                    versions_df = pd.DataFrame([
+                        {
+                            'Version': v['version'],
+                            'Saved At': v['saved_at'],
+                            'MAE': v['metrics'].get('MAE'),
+                            'RMSE': v['metrics'].get('RMSE'),
+                            'R2': v['metrics'].get('R2'),
+                            'Iterasi': (v['training'] or {}).get('n_iterations'),
+                            'Current': '✅' if v['is_current'] else ''
+                        }
+                        for v in versions
+                    ])
+                    st.dataframe(versions_df, use_container_width=True, hide_index=True)
+                    
+                    rollback_version = st.selectbox(
+                        "Rollback ke versi:",
+                        [v['version'] for v in versions if not v['is_current']],
+                        key=f"rollback_version_{selected_model}"
+                    )
+                    if st.button("⏪ Rollback", key=f"rollback_{selected_model}"):
+                        success, message = persistence.rollback_model(selected_model, rollback_version)
+                        if success:
+                            # Daftarkan ulang handle lazy agar sesi memakai versi yang baru aktif
+                            st.session_state.trained_models.pop(selected_model, None)
+                            persistence.load_all_models()
+                            st.success(message)
+                            st.rerun()
+                        else:
+                            st.error(message)
     
     st.markdown("---")
     
@@ -167,13 +274,14 @@ def show():
     - 💾 **Persistent Storage**: Model tersimpan di folder `saved_models/`
     - 🗑️ **Individual Delete**: Hapus model tertentu tanpa menghapus semua
     - 📊 **Metadata**: Metrics dan parameters tersimpan bersama model
+    - 🕘 **Versioning**: Setiap training menyimpan versi baru; artefak identik hanya disimpan sekali
     
     **Storage Location:** `{storage_info['base_dir']}/`
     """)
     
     with st.expander("⚠️ Important Notes"):
         st.markdown("""
-        1. Model disimpan menggunakan `pickle` format
+        1. Model disimpan dengan format native per library (`.cbm`, `.ubj`, `.keras`, `.joblib`); model lama `.pkl` tetap bisa dimuat
         2. Pastikan tidak menghapus folder `saved_models/` secara manual
         3. Model yang tersimpan akan tetap ada meskipun streamlit di-restart
         4. Jika mengupdate kode model trainer, model lama mungkin tidak kompatibel
@@ -0,0 +1,96 @@
+import streamlit as st
+from ml.data_loader import read_dataset_with_stats, iter_dataset_chunks
+from ml.feature_engine import PrefixSumIndex, stream_batch_features
+from ml.feature_store import compute_file_hash
+from ml.model_trainer import prepare_batch_data
+
+# Batas jumlah entry yang ditahan di memori (LRU, entry terlama dibuang)
+MAX_CACHED_DATASETS = 4
+MAX_CACHED_FEATURES = 8
+
+# Folder salinan Parquet hasil konversi xlsx
+DATASET_CACHE_DIR = "dataset_cache"
+
+
+def get_file_hash(uploaded_file):
+    """
+    Hash isi file upload, dihitung sekali per file_id
+
+    Rerun karena interaksi widget memakai file_id yang sama,
+    jadi isi file tidak perlu di-hash ulang.
+    """
+    file_id = getattr(uploaded_file, 'file_id', None) or (uploaded_file.name, uploaded_file.size)
+    cached = st.session_state.get("upload_hash")
+    if cached and cached[0] == file_id:
+        return cached[1]
+
+    file_hash = compute_file_hash(uploaded_file.getvalue())
+    st.session_state.upload_hash = (file_id, file_hash)
+    return file_hash
+
+
+@st.cache_resource(max_entries=MAX_CACHED_DATASETS, show_spinner=False)
+def load_dataset(file_hash, _file_bytes, file_name):
+    """
+    Parse file upload, di-memoize per hash isi file (DataFrame diperlakukan read-only)
+
+    Returns:
+        Tuple (data, stats) - stats berisi waktu parsing dan memori
+    """
+    return read_dataset_with_stats(_file_bytes, file_name, file_hash=file_hash, cache_dir=DATASET_CACHE_DIR)
+
+
+@st.cache_resource(max_entries=MAX_CACHED_DATASETS, show_spinner=False)
+def get_prefix_index(file_hash, _data):
+    """PrefixSumIndex per dataset, dipakai ulang untuk semua batch size"""
+    return PrefixSumIndex.from_frame(_data)
+
+
+@st.cache_resource(max_entries=MAX_CACHED_FEATURES, show_spinner=False)
+def get_batch_features(file_hash, _data, _feature_store, mode="full", batch_size=48, stride=None, n_segments=3):
+    """
+    Matriks fitur per (hash file, opsi), di-memoize di memori
+
+    Cache miss di memori masih dicoba dari feature store di disk
+    sebelum benar-benar menghitung ulang fitur.
+
+    Returns:
+        Tuple (X, y, feature_names, from_cache)
+    """
+    if mode == "full":
+        store_key = _feature_store.make_key(file_hash, mode=mode, batch_size=batch_size, stride=stride)
+
+        def compute_fn():
+            return prepare_batch_data(_data, batch_size=batch_size, stride=stride)
+    else:
+        store_key = _feature_store.make_key(
+            file_hash, mode=mode, batch_size=batch_size, stride=stride, n_segments=n_segments
+        )
+
+        def compute_fn():
+            return get_prefix_index(file_hash, _data).window_features(
+                batch_size=batch_size, stride=stride, n_segments=n_segments
+            )
+
+    return _feature_store.get_or_compute(store_key, compute_fn)
+
+
+@st.cache_resource(max_entries=MAX_CACHED_FEATURES, show_spinner=False)
+def get_streamed_features(file_hash, _source, _feature_store, file_name, batch_size=48):
+    """
+    Matriks fitur dari pembacaan streaming (batch tidak overlap)
+
+    Memakai kunci feature store yang sama dengan mode "full" ber-stride
+    batch_size, karena hasilnya identik.
+
+    Returns:
+        Tuple (X, y, feature_names, from_cache)
+    """
+    store_key = _feature_store.make_key(file_hash, mode="full", batch_size=batch_size, stride=batch_size)
+
+    def compute_fn():
+        if hasattr(_source, "seek"):
+            _source.seek(0)
+        return stream_batch_features(iter_dataset_chunks(_source, file_name), batch_size=batch_size)
+
+    return _feature_store.get_or_compute(store_key, compute_fn, source=file_name)
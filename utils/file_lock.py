@@ -0,0 +1,82 @@
+import os
+import threading
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    # Windows: hanya lock antar thread dalam satu proses
+    HAS_FCNTL = False
+
+
+class _LockState:
+    def __init__(self):
+        self.thread_lock = threading.RLock()
+        self.depth = 0
+        self.fd = None
+
+
+class FileLock:
+    """
+    Lock eksklusif berbasis file (flock) untuk writer antar proses.
+
+    Dipakai oleh writer saja (save/delete satu model, update manifest);
+    reader tidak pernah mengambil lock karena semua file ditulis dengan
+    pola file sementara + rename. State lock dibagi per path dalam satu
+    proses: thread lain menunggu, thread yang sama boleh masuk ulang.
+    """
+
+    _states = {}
+    _states_guard = threading.Lock()
+
+    def __init__(self, path):
+        self.path = path
+        with self._states_guard:
+            self._state = self._states.setdefault(os.path.abspath(path), _LockState())
+
+    def __enter__(self):
+        state = self._state
+        state.thread_lock.acquire()
+        if state.depth == 0 and HAS_FCNTL:
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                state.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                fcntl.flock(state.fd, fcntl.LOCK_EX)
+            except BaseException:
+                if state.fd is not None:
+                    os.close(state.fd)
+                    state.fd = None
+                state.thread_lock.release()
+                raise
+        state.depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        state = self._state
+        state.depth -= 1
+        if state.depth == 0 and state.fd is not None:
+            fcntl.flock(state.fd, fcntl.LOCK_UN)
+            os.close(state.fd)
+            state.fd = None
+        state.thread_lock.release()
+        return False
+
+
+def atomic_write(path, write_fn):
+    """
+    Tulis file lewat file sementara di folder yang sama lalu os.replace
+
+    Args:
+        path: Path tujuan
+        write_fn: Fungsi write_fn(tmp_path) yang menulis isi file
+    """
+    stem, extension = os.path.splitext(path)
+    # Ekstensi dipertahankan di akhir (mis. keras menolak file tanpa .keras)
+    tmp_path = f"{stem}.tmp-{os.getpid()}-{threading.get_ident()}{extension}"
+    try:
+        write_fn(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,125 @@
+import os
+import threading
+from collections import OrderedDict
+import streamlit as st
+
+# Budget memori cache model bersama (MB), bisa diatur lewat environment variable
+MODEL_CACHE_BUDGET_MB = int(os.environ.get("MODEL_CACHE_BUDGET_MB", "1024"))
+
+
+class SharedModelCache:
+    """
+    Cache object model yang dipakai bersama oleh semua sesi Streamlit.
+
+    Kunci berisi nama model + mtime/ukuran file, sehingga model yang dilatih
+    ulang otomatis mendapat entry baru. Setiap sesi yang memegang model
+    menambah reference count; hanya entry tanpa referensi yang bisa
+    dibuang (LRU) saat total ukuran melewati budget. Object yang dibagikan
+    harus diperlakukan read-only (predict saja, jangan di-fit ulang).
+    """
+
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self._loading_locks = {}
+        self.hits = 0
+        self.misses = 0
+
+    def acquire(self, key, loader, size_bytes=0):
+        """
+        Ambil object untuk key (muat dengan loader() jika belum ada) dan tambah refcount
+
+        Args:
+            key: Tuple (model_name, mtime_ns, size) dari ModelPersistence
+            loader: Fungsi tanpa argumen yang memuat object dari disk
+            size_bytes: Estimasi ukuran object di memori
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry['refs'] += 1
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry['value']
+            loading_lock = self._loading_locks.setdefault(key, threading.Lock())
+
+        # Muat di luar lock global; sesi lain yang meminta key yang sama menunggu di sini
+        with loading_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry['refs'] += 1
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry['value']
+
+            with self._lock:
+                self.misses += 1
+            try:
+                value = loader()
+            finally:
+                # Juga saat loader gagal (file hilang/rusak), agar lock tidak tertinggal
+                with self._lock:
+                    self._loading_locks.pop(key, None)
+
+            with self._lock:
+                self._drop_stale_versions(key)
+                self._entries[key] = {'value': value, 'size': size_bytes, 'refs': 1}
+                self._evict_over_budget()
+                return value
+
+    def release(self, key):
+        """Kurangi refcount (dipanggil saat handle sesi dibuang)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry['refs'] > 0:
+                entry['refs'] -= 1
+            self._evict_over_budget()
+
+    def invalidate(self, model_name):
+        """Buang semua versi model yang tidak sedang dipakai (mis. setelah dihapus)"""
+        with self._lock:
+            for key in [k for k, e in self._entries.items() if k[0] == model_name and e['refs'] == 0]:
+                del self._entries[key]
+
+    def clear(self):
+        """Buang semua entry tanpa referensi"""
+        with self._lock:
+            for key in [k for k, e in self._entries.items() if e['refs'] == 0]:
+                del self._entries[key]
+
+    def _drop_stale_versions(self, key):
+        for old_key in [k for k, e in self._entries.items() if k[0] == key[0] and k != key and e['refs'] == 0]:
+            del self._entries[old_key]
+
+    def _used_bytes(self):
+        return sum(e['size'] for e in self._entries.values())
+
+    def _evict_over_budget(self):
+        used = self._used_bytes()
+        for key in list(self._entries):
+            if used <= self.budget_bytes:
+                break
+            entry = self._entries[key]
+            if entry['refs'] == 0:
+                used -= entry['size']
+                del self._entries[key]
+
+    def get_stats(self):
+        """Statistik cache untuk ditampilkan di UI"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'in_use': sum(1 for e in self._entries.values() if e['refs'] > 0),
+                'used_mb': round(self._used_bytes() / (1024 * 1024), 2),
+                'budget_mb': round(self.budget_bytes / (1024 * 1024), 2),
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+@st.cache_resource
+def get_shared_model_cache():
+    """Satu SharedModelCache per proses server"""
+    return SharedModelCache(MODEL_CACHE_BUDGET_MB * 1024 * 1024)
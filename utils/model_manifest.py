@@ -0,0 +1,192 @@
+import os
+import json
+import hashlib
+from utils.file_lock import FileLock, atomic_write
+
+MANIFEST_VERSION = 1
+
+
+def file_checksum(path, chunk_size=1024 * 1024):
+    """sha256 isi file (dibaca per potongan)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ModelManifest:
+    """
+    Index tunggal (manifest.json) untuk semua model yang tersimpan.
+
+    Menyimpan nama, versi aktif, waktu simpan, metrics, params, ukuran file
+    dan checksum setiap model, ditambah ukuran setiap blob di object store,
+    sehingga listing dan statistik storage cukup membaca satu file kecil.
+    Isi manifest di-cache per mtime file; perubahan ditulis ke file
+    sementara lalu di-rename (atomic) di bawah file lock, sehingga beberapa
+    proses dashboard bisa berbagi folder yang sama.
+    """
+
+    def __init__(self, base_dir):
+        self.base_dir = base_dir
+        self.path = os.path.join(base_dir, "manifest.json")
+        self._cache = None
+        self._cache_stamp = None
+        self._lock = FileLock(os.path.join(base_dir, "locks", "manifest.lock"))
+
+    def _stamp(self):
+        try:
+            stat = os.stat(self.path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            return None
+
+    def read(self):
+        """Isi manifest ({'version', 'models': {nama: entry}}); dibangun ulang jika belum ada"""
+        stamp = self._stamp()
+        if stamp is not None and stamp == self._cache_stamp:
+            return self._cache
+
+        if stamp is None:
+            return self.rebuild()
+
+        try:
+            with open(self.path, 'r') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return self.rebuild()
+
+        self._cache, self._cache_stamp = manifest, stamp
+        return manifest
+
+    def _write(self, manifest):
+        os.makedirs(self.base_dir, exist_ok=True)
+        
+        def write(tmp_path):
+            with open(tmp_path, 'w') as f:
+                json.dump(manifest, f, indent=2)
+        
+        atomic_write(self.path, write)
+        self._cache, self._cache_stamp = manifest, self._stamp()
+
+    def _apply(self, manifest, objects=None, removed_objects=()):
+        stored_objects = dict(manifest.get('objects', {}))
+        stored_objects.update(objects or {})
+        for relpath in removed_objects:
+            stored_objects.pop(relpath, None)
+        return stored_objects
+
+    def update(self, model_name, entry, objects=None, removed_objects=()):
+        """
+        Tambah/ganti entry model (transaksional)
+
+        Args:
+            model_name: Nama model
+            entry: Entry dari make_entry
+            objects: Blob baru {relpath: size}
+            removed_objects: Blob yang dihapus garbage collection
+        """
+        with self._lock:
+            manifest = self.read()
+            models = dict(manifest['models'])
+            models[model_name] = entry
+            self._write({
+                'version': MANIFEST_VERSION,
+                'models': models,
+                'objects': self._apply(manifest, objects, removed_objects)
+            })
+
+    def remove(self, model_name, removed_objects=()):
+        """Hapus entry model (None = hanya catat blob yang dihapus) (transaksional)"""
+        with self._lock:
+            manifest = self.read()
+            if model_name not in manifest['models'] and not removed_objects:
+                return
+            models = {k: v for k, v in manifest['models'].items() if k != model_name}
+            self._write({
+                'version': MANIFEST_VERSION,
+                'models': models,
+                'objects': self._apply(manifest, removed_objects=removed_objects)
+            })
+
+    def rebuild(self):
+        """Bangun manifest dari folder metadata (untuk storage lama / manifest rusak)"""
+        with self._lock:
+            models = {}
+            metadata_dir = os.path.join(self.base_dir, "metadata")
+            models_dir = os.path.join(self.base_dir, "models")
+
+            if os.path.isdir(metadata_dir):
+                for filename in sorted(os.listdir(metadata_dir)):
+                    if not filename.endswith('.json'):
+                        continue
+                    metadata_path = os.path.join(metadata_dir, filename)
+                    try:
+                        with open(metadata_path, 'r') as f:
+                            metadata = json.load(f)
+                    except (OSError, ValueError):
+                        continue
+
+                    stem = filename[:-len('.json')]
+                    files = [metadata_path]
+                    serialization = metadata.get('serialization') or {}
+                    if serialization.get('blob'):
+                        files.append(os.path.join(self.base_dir, serialization['blob']))
+                    else:
+                        model_path = os.path.join(models_dir, serialization.get('file', f"{stem}.pkl"))
+                        if os.path.exists(model_path):
+                            files.append(model_path)
+                    prediction_files = metadata.get('predictions', {}).get('files')
+                    if prediction_files:
+                        files += [os.path.join(self.base_dir, relpath) for relpath in prediction_files.values()]
+                    else:
+                        prediction_dir = os.path.join(self.base_dir, "predictions", stem)
+                        if os.path.isdir(prediction_dir):
+                            files += [os.path.join(prediction_dir, name) for name in sorted(os.listdir(prediction_dir))]
+
+                    files = [path for path in files if os.path.exists(path)]
+                    models[metadata['model_name']] = self.make_entry(metadata, files)
+
+            from utils.object_store import ObjectStore
+            objects = dict(ObjectStore(self.base_dir).iter_objects())
+
+            manifest = {'version': MANIFEST_VERSION, 'models': models, 'objects': objects}
+            self._write(manifest)
+            return manifest
+
+    def make_entry(self, metadata, files, checksums=None):
+        """
+        Entry manifest dari metadata model dan daftar file artefaknya (path relatif base_dir)
+
+        Args:
+            metadata: Metadata versi model yang aktif
+            files: Path file artefak
+            checksums: {relpath: sha256} yang sudah diketahui (blob object store)
+        """
+        checksums = checksums or {}
+        entry_files = {}
+        for path in files:
+            relpath = os.path.relpath(path, self.base_dir).replace(os.sep, '/')
+            entry_files[relpath] = {
+                'size': os.path.getsize(path),
+                'sha256': checksums.get(relpath) or file_checksum(path)
+            }
+
+        return {
+            'version': metadata.get('version'),
+            'saved_at': metadata.get('saved_at', 'Unknown'),
+            'metrics': metadata.get('metrics', {}),
+            'params': metadata.get('params', {}),
+            'serialization': metadata.get('serialization'),
+            'training': metadata.get('training'),
+            'files': entry_files
+        }
+
+    def total_size(self):
+        """Total ukuran semua artefak model (bytes) menurut manifest, blob bersama dihitung sekali"""
+        manifest = self.read()
+        sizes = dict(manifest.get('objects', {}))
+        for entry in manifest['models'].values():
+            for relpath, info in entry.get('files', {}).items():
+                sizes[relpath] = info['size']
+        return sum(sizes.values())
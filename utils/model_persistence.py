@@ -1,22 +1,149 @@
 import os
-import pickle
 import json
+import shutil
+import time
+import weakref
+import numpy as np
 from datetime import datetime
 import streamlit as st
+from utils.model_manifest import ModelManifest
+from utils.model_serializer import MODEL_EXTENSIONS, save_model_file, load_model_file
+from utils.file_lock import FileLock, atomic_write
+from utils.object_store import ObjectStore
+from utils.test_splits import compute_split_id, test_splits
+from collections.abc import MutableMapping
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Jumlah thread untuk memuat model secara paralel, bisa diatur lewat environment variable
+MODEL_LOAD_WORKERS = int(os.environ.get("MODEL_LOAD_WORKERS", str(min(8, os.cpu_count() or 1))))
+# Jumlah versi yang disimpan per nama model (versi lama dipangkas, blob tak terpakai dihapus)
+MODEL_MAX_VERSIONS = int(os.environ.get("MODEL_MAX_VERSIONS", "20"))
+# Muat semua object model saat startup (default: lazy, dimuat saat pertama dipakai)
+MODEL_PRELOAD = os.environ.get("MODEL_PRELOAD", "0") == "1"
+
+_NOT_LOADED = object()
+
+class LazyModelEntry(MutableMapping):
+    """
+    Entry trained_models yang dimuat dari disk secara lazy.
+    
+    Berperilaku seperti dictionary model_data biasa ('model', 'metrics',
+    'params', 'predictions', 'saved_at'). Metrics dan params langsung
+    tersedia dari metadata; 'model' baru dimuat dan 'predictions'
+    baru dibaca saat pertama kali diakses, dan bisa dilepas lagi dengan
+    unload() (dimuat ulang otomatis saat diakses berikutnya).
+    """
+    
+    LAZY_KEYS = ('model', 'predictions')
+    
+    def __init__(self, persistence, model_info):
+        self._persistence = persistence
+        self.model_name = model_info['name']
+        self._data = {
+            'metrics': model_info['metrics'],
+            'params': model_info.get('params', {}),
+            'saved_at': model_info.get('saved_at', 'Unknown')
+        }
+        # Estimasi ukuran object model di memori (dari metadata serialization)
+        serialization = model_info.get('serialization') or {}
+        self.model_size_hint = serialization.get('pickle_size_bytes') or serialization.get('size_bytes') or 0
+        self._release = None
+        # Dipanggil setelah bagian lazy dimuat (dipakai TrainedModelStore untuk budget memori)
+        self.on_load = None
+    
+    def _load(self, key):
+        if key == 'model':
+            value, release = self._persistence.acquire_shared_model_object(self.model_name)
+            if value is None:
+                raise KeyError(f"Model file for '{self.model_name}' not found")
+            if release is not None:
+                self._release = weakref.finalize(self, release)
+        else:
+            value = self._persistence.load_predictions(self.model_name)
+        self._data[key] = value
+        
+        if self.on_load is not None:
+            self.on_load(self)
+        # Dikembalikan langsung: eviction dari thread lain bisa unload() sebelum _data dibaca lagi
+        return value
+    
+    def unload(self):
+        """Lepas object model dan predictions dari memori (referensi cache bersama ikut dilepas)"""
+        self._data.pop('model', None)
+        self._data.pop('predictions', None)
+        if self._release is not None:
+            self._release()
+            self._release = None
+    
+    def is_loaded(self, key='model'):
+        """Cek apakah bagian lazy sudah dimuat ke memori"""
+        return key in self._data
+    
+    def __getitem__(self, key):
+        if key in self.LAZY_KEYS:
+            value = self._data.get(key, _NOT_LOADED)
+            return self._load(key) if value is _NOT_LOADED else value
+        return self._data[key]
+    
+    def __setitem__(self, key, value):
+        self._data[key] = value
+    
+    def __delitem__(self, key):
+        del self._data[key]
+    
+    def __iter__(self):
+        yield from self._data
+        for key in self.LAZY_KEYS:
+            if key not in self._data:
+                yield key
+    
+    def __len__(self):
+        return len(set(self._data) | set(self.LAZY_KEYS))
+    
+    def __repr__(self):
+        loaded = [k for k in self.LAZY_KEYS if k in self._data]
+        return f"LazyModelEntry({self.model_name!r}, loaded={loaded})"
 
 class ModelPersistence:
     """Class untuk menyimpan dan memuat model ke/dari disk"""
     
-    def __init__(self, base_dir="saved_models"):
+    def __init__(self, base_dir="saved_models", model_cache=None, prediction_dtype=None, compression='auto',
+                 max_versions=None):
+        """
+        Args:
+            base_dir: Folder penyimpanan
+            model_cache: SharedModelCache opsional untuk berbagi object model antar sesi
+            prediction_dtype: dtype penyimpanan y_pred/y_test (mis. 'float32' untuk
+                menghemat setengah ruang); None = simpan dengan dtype asli
+            compression: Kompresi joblib untuk model sklearn ('auto' = lz4 jika
+                terpasang, selain itu tanpa kompresi; None = tanpa kompresi)
+            max_versions: Jumlah versi yang disimpan per model (default MODEL_MAX_VERSIONS)
+        """
         self.base_dir = base_dir
+        self.model_cache = model_cache
+        self.prediction_dtype = prediction_dtype
+        self.compression = compression
+        self.max_versions = max_versions or MODEL_MAX_VERSIONS
         self.models_dir = os.path.join(base_dir, "models")
         self.metadata_dir = os.path.join(base_dir, "metadata")
+        self.predictions_dir = os.path.join(base_dir, "predictions")
+        self.versions_dir = os.path.join(base_dir, "versions")
+        self.locks_dir = os.path.join(base_dir, "locks")
         self._ensure_directories()
+        self.manifest = ModelManifest(base_dir)
+        self.objects = ObjectStore(base_dir)
     
     def _ensure_directories(self):
         """Buat direktori jika belum ada"""
         os.makedirs(self.models_dir, exist_ok=True)
         os.makedirs(self.metadata_dir, exist_ok=True)
+        os.makedirs(self.predictions_dir, exist_ok=True)
+        os.makedirs(self.versions_dir, exist_ok=True)
+        os.makedirs(self.locks_dir, exist_ok=True)
+    
+    def _model_lock(self, sanitized_name):
+        """File lock per model: writer model yang sama antri, model lain tetap jalan"""
+        return FileLock(os.path.join(self.locks_dir, f"{sanitized_name}.lock"))
     
     def _sanitize_filename(self, name):
         """Bersihkan nama file dari karakter tidak valid"""
@@ -24,7 +151,16 @@ class ModelPersistence:
     
     def save_model(self, model_name, model_data):
         """
-        Simpan model dan metadata ke disk
+        Simpan model sebagai versi baru
+        
+        Artefak (file model, y_pred, y_test) disimpan di object store
+        berdasarkan hash isinya, sehingga retrain identik tidak menambah
+        ruang disk. Nama model hanya menunjuk ke versi terakhir
+        (metadata/<nama>.json); riwayat versi ada di versions/<nama>/ dan
+        bisa di-rollback. Metadata ditulis paling akhir dengan pola file
+        sementara + rename, sehingga reader (tanpa lock) selalu melihat
+        versi yang utuh. Writer untuk nama model yang sama diserialisasi
+        dengan file lock.
         
         Args:
             model_name: Nama model
@@ -32,33 +168,205 @@ class ModelPersistence:
         """
         try:
             sanitized_name = self._sanitize_filename(model_name)
+            with self._model_lock(sanitized_name):
+                version = self._save_model_locked(model_name, sanitized_name, model_data)
             
-            # Simpan model object
-            model_path = os.path.join(self.models_dir, f"{sanitized_name}.pkl")
-            with open(model_path, 'wb') as f:
-                pickle.dump(model_data['model'], f)
+            return True, f"Model '{model_name}' berhasil disimpan! (versi {version})"
             
-            # Simpan metadata (metrics, params, predictions)
+        except Exception as e:
+            self.objects.clear_staging()
+            return False, f"Error menyimpan model: {str(e)}"
+    
+    def _save_model_locked(self, model_name, sanitized_name, model_data):
+        # Serialisasi dengan format native keluarganya (.cbm, .ubj, .keras, .joblib) ke staging
+        staged_model, serialization = save_model_file(
+            model_data['model'],
+            self.objects.staging_path(sanitized_name),
+            compression=self.compression
+        )
+        staged_predictions, prediction_dtypes = self._stage_predictions(sanitized_name, model_data['predictions'])
+        # y_test dengan split yang sama menjadi satu blob di object store; split_id
+        # dipakai untuk berbagi satu array di memori saat dimuat
+        split_id = model_data['predictions'].get('split_id') or compute_split_id(model_data['predictions']['y_test'])
+        
+        with self.objects.lock:
+            # Publish artefak ke object store (isi identik disimpan sekali)
+            model_blob, model_size, model_sha, _ = self.objects.put(
+                staged_model, os.path.splitext(staged_model)[1]
+            )
+            del serialization['file']
+            serialization['blob'] = model_blob
+            
+            new_objects = {model_blob: model_size}
+            checksums = {model_blob: model_sha}
+            prediction_files = {}
+            for key, staged_path in staged_predictions.items():
+                blob, size, sha, _ = self.objects.put(staged_path, '.npy')
+                prediction_files[key] = blob
+                new_objects[blob] = size
+                checksums[blob] = sha
+            
+            version = self._next_version(sanitized_name)
             metadata = {
                 'model_name': model_name,
+                'version': version,
                 'metrics': model_data['metrics'],
                 'params': model_data['params'],
                 'predictions': {
-                    'y_pred': model_data['predictions']['y_pred'].tolist() if hasattr(model_data['predictions']['y_pred'], 'tolist') else list(model_data['predictions']['y_pred']),
-                    'y_test': model_data['predictions']['y_test'].tolist() if hasattr(model_data['predictions']['y_test'], 'tolist') else list(model_data['predictions']['y_test']),
+                    'format': 'npy',
+                    'files': prediction_files,
+                    'split_id': split_id,
+                    'n_samples': int(len(model_data['predictions']['y_pred'])),
+                    'dtypes': prediction_dtypes,
                     'feature_importance': model_data['predictions'].get('feature_importance', {})
                 },
+                'serialization': serialization,
                 'saved_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             }
+            if model_data.get('training'):
+                # Hasil early stopping (iterasi terbaik, jumlah iterasi yang dijalankan)
+                metadata['training'] = model_data['training']
             
+            self._write_json(self._version_path(sanitized_name, version), metadata)
             metadata_path = os.path.join(self.metadata_dir, f"{sanitized_name}.json")
-            with open(metadata_path, 'w') as f:
-                json.dump(metadata, f, indent=4)
+            self._write_json(metadata_path, metadata)
+            
+            # Pangkas versi lama, lalu hapus blob yang tidak direferensikan lagi
+            removed_objects = []
+            if self._prune_versions(sanitized_name, keep=version):
+                removed_objects = self.objects.collect_garbage(self._referenced_objects())
+        
+        # File layout lama (models/<nama>.*, predictions/<nama>/) tidak dipakai lagi
+        self._remove_legacy_files(sanitized_name)
+        
+        # Update index
+        self.manifest.update(
+            model_name,
+            self.manifest.make_entry(
+                metadata,
+                [metadata_path] + [self.objects.path(blob) for blob in new_objects],
+                checksums=checksums
+            ),
+            objects=new_objects,
+            removed_objects=removed_objects
+        )
+        return version
+    
+    @staticmethod
+    def _write_json(path, data):
+        def write(tmp_path):
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f, indent=4)
+        
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        atomic_write(path, write)
+    
+    def _version_path(self, sanitized_name, version):
+        return os.path.join(self.versions_dir, sanitized_name, f"{version:06d}.json")
+    
+    def _version_numbers(self, sanitized_name):
+        version_dir = os.path.join(self.versions_dir, sanitized_name)
+        if not os.path.isdir(version_dir):
+            return []
+        return sorted(
+            int(name[:-len('.json')]) for name in os.listdir(version_dir)
+            if name.endswith('.json') and name[:-len('.json')].isdigit()
+        )
+    
+    def _next_version(self, sanitized_name):
+        versions = self._version_numbers(sanitized_name)
+        return versions[-1] + 1 if versions else 1
+    
+    def _prune_versions(self, sanitized_name, keep):
+        """Hapus versi terlama di atas max_versions (versi keep tidak pernah dihapus)"""
+        versions = self._version_numbers(sanitized_name)
+        excess = [v for v in versions[:-self.max_versions] if v != keep]
+        for version in excess:
+            os.remove(self._version_path(sanitized_name, version))
+        return bool(excess)
+    
+    def _referenced_objects(self):
+        """Semua blob yang direferensikan versi mana pun atau metadata aktif"""
+        metadata_paths = [os.path.join(self.metadata_dir, name) for name in os.listdir(self.metadata_dir)]
+        for model_dir in os.listdir(self.versions_dir):
+            version_dir = os.path.join(self.versions_dir, model_dir)
+            if os.path.isdir(version_dir):
+                metadata_paths += [os.path.join(version_dir, name) for name in os.listdir(version_dir)]
+        
+        referenced = set()
+        for path in metadata_paths:
+            if not path.endswith('.json'):
+                continue
+            try:
+                with open(path, 'r') as f:
+                    metadata = json.load(f)
+            except (OSError, ValueError):
+                continue
+            referenced.update(self._metadata_objects(metadata))
+        return referenced
+    
+    @staticmethod
+    def _metadata_objects(metadata):
+        """Blob (relpath) yang dipakai satu metadata"""
+        objects = list(metadata.get('predictions', {}).get('files', {}).values())
+        blob = (metadata.get('serialization') or {}).get('blob')
+        if blob:
+            objects.append(blob)
+        return objects
+    
+    def list_versions(self, model_name):
+        """
+        Riwayat versi model, terbaru dulu
+        
+        Returns:
+            List dictionary berisi version, saved_at, metrics, params, training, is_current
+        """
+        sanitized_name = self._sanitize_filename(model_name)
+        current = (self.load_metadata(model_name) or {}).get('version')
+        versions = []
+        for version in reversed(self._version_numbers(sanitized_name)):
+            try:
+                with open(self._version_path(sanitized_name, version), 'r') as f:
+                    metadata = json.load(f)
+            except (OSError, ValueError):
+                continue
+            versions.append({
+                'version': version,
+                'saved_at': metadata.get('saved_at', 'Unknown'),
+                'metrics': metadata.get('metrics', {}),
+                'params': metadata.get('params', {}),
+                'training': metadata.get('training'),
+                'is_current': version == current
+            })
+        return versions
+    
+    def rollback_model(self, model_name, version):
+        """Arahkan nama model kembali ke versi sebelumnya (tanpa menyalin artefak)"""
+        try:
+            sanitized_name = self._sanitize_filename(model_name)
+            with self._model_lock(sanitized_name):
+                version_path = self._version_path(sanitized_name, version)
+                if not os.path.exists(version_path):
+                    return False, f"Versi {version} model '{model_name}' tidak ditemukan"
+                
+                with open(version_path, 'r') as f:
+                    metadata = json.load(f)
+                
+                metadata_path = os.path.join(self.metadata_dir, f"{sanitized_name}.json")
+                self._write_json(metadata_path, metadata)
+                
+                self.manifest.update(
+                    model_name,
+                    self.manifest.make_entry(
+                        metadata,
+                        [metadata_path] + [self.objects.path(blob) for blob in self._metadata_objects(metadata)]
+                    )
+                )
             
-            return True, f"Model '{model_name}' berhasil disimpan!"
+            return True, f"Model '{model_name}' dikembalikan ke versi {version}"
             
         except Exception as e:
-            return False, f"Error menyimpan model: {str(e)}"
+            return False, f"Error rollback model: {str(e)}"
     
     def load_model(self, model_name):
         """
@@ -71,35 +379,20 @@ class ModelPersistence:
             Dictionary berisi model, metrics, predictions, params atau None
         """
         try:
-            sanitized_name = self._sanitize_filename(model_name)
-            
-            # Load model object
-            model_path = os.path.join(self.models_dir, f"{sanitized_name}.pkl")
-            if not os.path.exists(model_path):
+            metadata = self.load_metadata(model_name)
+            if metadata is None:
                 return None
             
-            with open(model_path, 'rb') as f:
-                model = pickle.load(f)
-            
-            # Load metadata
-            metadata_path = os.path.join(self.metadata_dir, f"{sanitized_name}.json")
-            if not os.path.exists(metadata_path):
+            model = self.load_model_object(model_name, metadata)
+            if model is None:
                 return None
             
-            with open(metadata_path, 'r') as f:
-                metadata = json.load(f)
-            
             # Reconstruct model_data
-            import numpy as np
             model_data = {
                 'model': model,
                 'metrics': metadata['metrics'],
                 'params': metadata['params'],
-                'predictions': {
-                    'y_pred': np.array(metadata['predictions']['y_pred']),
-                    'y_test': np.array(metadata['predictions']['y_test']),
-                    'feature_importance': metadata['predictions'].get('feature_importance', {})
-                },
+                'predictions': self.load_predictions(model_name, metadata),
                 'saved_at': metadata.get('saved_at', 'Unknown')
             }
             
@@ -109,19 +402,162 @@ class ModelPersistence:
             st.error(f"Error memuat model '{model_name}': {str(e)}")
             return None
     
-    def delete_model(self, model_name):
-        """Hapus model dari disk"""
+    def load_metadata(self, model_name):
+        """Muat metadata JSON model, atau None jika tidak ada"""
+        sanitized_name = self._sanitize_filename(model_name)
+        metadata_path = os.path.join(self.metadata_dir, f"{sanitized_name}.json")
+        if not os.path.exists(metadata_path):
+            return None
+        
+        with open(metadata_path, 'r') as f:
+            return json.load(f)
+    
+    def _model_path(self, model_name, metadata=None):
+        """Path file model menurut metadata; model lama tanpa info serialization = .pkl"""
+        sanitized_name = self._sanitize_filename(model_name)
+        serialization = (metadata or {}).get('serialization')
+        if serialization and serialization.get('blob'):
+            return self.objects.path(serialization['blob'])
+        if serialization:
+            return os.path.join(self.models_dir, serialization['file'])
+        return os.path.join(self.models_dir, f"{sanitized_name}.pkl")
+    
+    def _remove_legacy_files(self, sanitized_name):
+        """Hapus file model/predictions layout lama (sebelum object store)"""
+        for extension in MODEL_EXTENSIONS:
+            path = os.path.join(self.models_dir, f"{sanitized_name}{extension}")
+            if os.path.exists(path):
+                os.remove(path)
+        
+        # File yang sedang di-mmap reader tetap valid sampai dilepas (POSIX)
+        prediction_dir = os.path.join(self.predictions_dir, sanitized_name)
+        if os.path.exists(prediction_dir):
+            shutil.rmtree(prediction_dir, ignore_errors=True)
+    
+    def load_model_object(self, model_name, metadata=None):
+        """Muat object model saja, atau None jika file tidak ada"""
+        if metadata is None:
+            metadata = self.load_metadata(model_name) or {}
+        model_path = self._model_path(model_name, metadata)
+        if not os.path.exists(model_path):
+            return None
+        
+        return load_model_file(model_path, metadata.get('serialization'))
+    
+    def acquire_shared_model_object(self, model_name):
+        """
+        Muat object model lewat cache bersama dan tambah refcount-nya
+        
+        Returns:
+            Tuple (model, release) - release() melepas referensi di cache
+            (None jika tanpa cache); model None jika file tidak ada
+        """
+        if self.model_cache is None:
+            return self.load_model_object(model_name), None
+        
+        metadata = self.load_metadata(model_name) or {}
+        model_path = self._model_path(model_name, metadata)
         try:
-            sanitized_name = self._sanitize_filename(model_name)
+            stat = os.stat(model_path)
+        except FileNotFoundError:
+            return None, None
+        
+        # File terkompresi lebih kecil dari object di memori: pakai ukuran pickle jika tercatat
+        size_bytes = (metadata.get('serialization') or {}).get('pickle_size_bytes') or stat.st_size
+        key = (model_name, stat.st_mtime_ns, stat.st_size)
+        model = self.model_cache.acquire(
+            key, lambda: self.load_model_object(model_name, metadata), size_bytes=size_bytes
+        )
+        return model, lambda: self.model_cache.release(key)
+    
+    def _legacy_prediction_paths(self, sanitized_name):
+        prediction_dir = os.path.join(self.predictions_dir, sanitized_name)
+        return os.path.join(prediction_dir, "y_pred.npy"), os.path.join(prediction_dir, "y_test.npy")
+    
+    def _stage_predictions(self, sanitized_name, predictions):
+        """Tulis y_pred dan y_test ke .npy di staging, kembalikan ({key: path}, {key: dtype})"""
+        staged = {}
+        dtypes = {}
+        for key in ('y_pred', 'y_test'):
+            values = np.asarray(predictions[key]).ravel()
+            if self.prediction_dtype is not None:
+                values = values.astype(self.prediction_dtype)
+            path = f"{self.objects.staging_path(sanitized_name)}-{key}.npy"
+            np.save(path, values, allow_pickle=False)
+            staged[key] = path
+            dtypes[key] = str(values.dtype)
+        
+        return staged, dtypes
+    
+    def load_predictions(self, model_name, metadata=None):
+        """
+        Muat y_pred, y_test dan feature importance model
+        
+        Format .npy di-memory-map (read-only), layout lama (predictions/<nama>/
+        dan list di JSON) tetap didukung.
+        """
+        if metadata is None:
+            metadata = self.load_metadata(model_name) or {}
+        predictions = metadata.get('predictions', {})
+        
+        if predictions.get('files'):
+            y_pred_path = self.objects.path(predictions['files']['y_pred'])
+            y_test_path = self.objects.path(predictions['files']['y_test'])
+            y_pred = np.load(y_pred_path, mmap_mode='r', allow_pickle=False)
             
-            model_path = os.path.join(self.models_dir, f"{sanitized_name}.pkl")
-            metadata_path = os.path.join(self.metadata_dir, f"{sanitized_name}.json")
+            def load_y_test():
+                return np.load(y_test_path, mmap_mode='r', allow_pickle=False)
             
-            if os.path.exists(model_path):
-                os.remove(model_path)
+            if predictions.get('split_id'):
+                # Semua model pada split yang sama memakai satu array y_test
+                y_test = test_splits.load(predictions['split_id'], load_y_test)
+            else:
+                y_test = load_y_test()
+        elif predictions.get('format') == 'npy':
+            y_pred_path, y_test_path = self._legacy_prediction_paths(self._sanitize_filename(model_name))
+            y_pred = np.load(y_pred_path, mmap_mode='r', allow_pickle=False)
+            y_test = np.load(y_test_path, mmap_mode='r', allow_pickle=False)
+        else:
+            y_pred = np.array(predictions.get('y_pred', []))
+            y_test = np.array(predictions.get('y_test', []))
+        
+        result = {
+            'y_pred': y_pred,
+            'y_test': y_test,
+            'feature_importance': predictions.get('feature_importance', {})
+        }
+        if predictions.get('split_id'):
+            result['split_id'] = predictions['split_id']
+        return result
+    
+    def delete_model(self, model_name, collect_garbage=True):
+        """
+        Hapus model beserta semua versinya (metadata dulu, sehingga reader langsung tidak melihatnya)
+        
+        Args:
+            collect_garbage: Hapus blob yang tidak direferensikan lagi sekarang; False jika
+                pemanggil mengumpulkannya sekali di akhir (mis. clear_all_saved_models)
+        """
+        try:
+            sanitized_name = self._sanitize_filename(model_name)
+            
+            with self._model_lock(sanitized_name):
+                metadata_path = os.path.join(self.metadata_dir, f"{sanitized_name}.json")
+                if os.path.exists(metadata_path):
+                    os.remove(metadata_path)
+                
+                shutil.rmtree(os.path.join(self.versions_dir, sanitized_name), ignore_errors=True)
+                self._remove_legacy_files(sanitized_name)
+                
+                # Blob yang masih dipakai model lain (isi identik) tetap disimpan
+                removed_objects = []
+                if collect_garbage:
+                    with self.objects.lock:
+                        removed_objects = self.objects.collect_garbage(self._referenced_objects())
+                self.manifest.remove(model_name, removed_objects=removed_objects)
             
-            if os.path.exists(metadata_path):
-                os.remove(metadata_path)
+            if self.model_cache is not None:
+                self.model_cache.invalidate(model_name)
             
             return True, f"Model '{model_name}' berhasil dihapus!"
             
@@ -129,34 +565,34 @@ class ModelPersistence:
             return False, f"Error menghapus model: {str(e)}"
     
     def list_saved_models(self):
-        """Dapatkan list semua model yang tersimpan"""
+        """Dapatkan list semua model yang tersimpan (dibaca dari manifest)"""
         try:
-            models = []
-            
-            if not os.path.exists(self.metadata_dir):
-                return models
-            
-            for filename in os.listdir(self.metadata_dir):
-                if filename.endswith('.json'):
-                    metadata_path = os.path.join(self.metadata_dir, filename)
-                    
-                    with open(metadata_path, 'r') as f:
-                        metadata = json.load(f)
-                    
-                    models.append({
-                        'name': metadata['model_name'],
-                        'saved_at': metadata.get('saved_at', 'Unknown'),
-                        'metrics': metadata['metrics']
-                    })
-            
-            return models
+            manifest = self.manifest.read()
+            
+            return [
+                {
+                    'name': model_name,
+                    'saved_at': entry.get('saved_at', 'Unknown'),
+                    'metrics': entry['metrics'],
+                    'params': entry.get('params', {}),
+                    'version': entry.get('version'),
+                    'serialization': entry.get('serialization'),
+                    'training': entry.get('training')
+                }
+                for model_name, entry in manifest['models'].items()
+            ]
             
         except Exception as e:
             st.error(f"Error membaca saved models: {str(e)}")
             return []
     
     def load_all_models(self):
-        """Muat semua model yang tersimpan ke session state"""
+        """
+        Daftarkan semua model yang tersimpan ke session state
+        
+        Yang dimasukkan adalah LazyModelEntry: hanya metadata dan metrics
+        yang dibaca, object model dan predictions baru dimuat saat diakses.
+        """
         saved_models = self.list_saved_models()
         loaded_count = 0
         
@@ -165,49 +601,122 @@ class ModelPersistence:
             
             # Cek apakah model sudah ada di session state
             if model_name not in st.session_state.trained_models:
-                model_data = self.load_model(model_name)
-                
-                if model_data:
-                    st.session_state.trained_models[model_name] = model_data
-                    loaded_count += 1
+                st.session_state.trained_models[model_name] = LazyModelEntry(self, model_info)
+                loaded_count += 1
         
         return loaded_count, len(saved_models)
     
+    def preload_models(self, entries, max_workers=None, progress_callback=None):
+        """
+        Muat object model dari banyak LazyModelEntry sekaligus di thread pool
+        
+        Baca file dan deserialisasi array numpy sebagian besar melepas GIL,
+        sehingga waktu total mengikuti jumlah core, bukan jumlah model. Model
+        yang gagal dimuat dicatat tanpa menghentikan model lain.
+        
+        Args:
+            entries: Dictionary {nama: LazyModelEntry} (mis. st.session_state.trained_models)
+            max_workers: Jumlah thread (default MODEL_LOAD_WORKERS)
+            progress_callback: Fungsi (done, total, model_name, error) yang dipanggil
+                di thread pemanggil setiap satu model selesai
+        
+        Returns:
+            Dictionary berisi loaded (list nama), failed ({nama: pesan error}), seconds
+        """
+        pending = {
+            name: entry for name, entry in entries.items()
+            if isinstance(entry, LazyModelEntry) and not entry.is_loaded('model')
+        }
+        report = {'loaded': [], 'failed': {}, 'seconds': 0.0}
+        if not pending:
+            return report
+        
+        start = time.perf_counter()
+        workers = max(1, min(max_workers or MODEL_LOAD_WORKERS, len(pending)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="model-loader") as executor:
+            futures = {executor.submit(entry.__getitem__, 'model'): name for name, entry in pending.items()}
+            for done, future in enumerate(as_completed(futures), start=1):
+                model_name = futures[future]
+                error = None
+                try:
+                    future.result()
+                    report['loaded'].append(model_name)
+                except Exception as e:
+                    error = str(e)
+                    report['failed'][model_name] = error
+                
+                if progress_callback is not None:
+                    progress_callback(done, len(pending), model_name, error)
+        
+        report['seconds'] = time.perf_counter() - start
+        return report
+    
     def clear_all_saved_models(self):
-        """Hapus semua model yang tersimpan"""
+        """
+        Hapus semua model yang tersimpan
+        
+        Model dihapus satu per satu lewat delete_model (dengan lock per
+        model), bukan rmtree seluruh folder, sehingga proses lain yang
+        sedang membaca atau menyimpan tidak kehilangan folder di tengah jalan.
+        Blob yang tidak direferensikan lagi dikumpulkan sekali di akhir,
+        bukan per model (setiap pengumpulan membaca ulang semua metadata).
+        """
         try:
-            import shutil
+            failed = []
+            for model_name in list(self.manifest.rebuild()['models']):
+                success, _ = self.delete_model(model_name, collect_garbage=False)
+                if not success:
+                    failed.append(model_name)
+            
+            # Sisa file tanpa metadata (mis. .pkl lama yatim); file sementara writer aktif dilewati
+            for folder in (self.models_dir, self.predictions_dir, self.versions_dir):
+                for name in os.listdir(folder):
+                    if '.tmp-' not in name:
+                        self._remove_orphan(os.path.join(folder, name))
+            
+            with self.objects.lock:
+                removed_objects = self.objects.collect_garbage(self._referenced_objects())
+            self.manifest.remove(None, removed_objects=removed_objects)
             
-            if os.path.exists(self.base_dir):
-                shutil.rmtree(self.base_dir)
-                self._ensure_directories()
+            if self.model_cache is not None:
+                self.model_cache.clear()
             
+            if failed:
+                return False, f"Gagal menghapus: {', '.join(failed)}"
             return True, "Semua saved models berhasil dihapus!"
             
         except Exception as e:
             return False, f"Error menghapus saved models: {str(e)}"
     
+    def _remove_orphan(self, path):
+        """Hapus file/folder model yang tidak punya metadata (dicek ulang di bawah lock model)"""
+        stem = os.path.basename(path)
+        if os.path.isfile(path):
+            stem = os.path.splitext(stem)[0]
+        
+        with self._model_lock(stem):
+            if os.path.exists(os.path.join(self.metadata_dir, f"{stem}.json")):
+                # Baru saja disimpan ulang oleh writer lain
+                return
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            elif os.path.exists(path):
+                os.remove(path)
+    
     def get_storage_info(self):
-        """Dapatkan informasi storage"""
+        """Dapatkan informasi storage (dari manifest, tanpa os.walk)"""
         try:
-            total_size = 0
-            model_count = 0
-            
-            if os.path.exists(self.base_dir):
-                for dirpath, dirnames, filenames in os.walk(self.base_dir):
-                    for filename in filenames:
-                        filepath = os.path.join(dirpath, filename)
-                        total_size += os.path.getsize(filepath)
-                        
-                        if filename.endswith('.pkl'):
-                            model_count += 1
+            manifest = self.manifest.read()
+            total_size = self.manifest.total_size()
+            if os.path.exists(self.manifest.path):
+                total_size += os.path.getsize(self.manifest.path)
             
             # Convert to MB
             size_mb = total_size / (1024 * 1024)
             
             return {
                 'total_size_mb': round(size_mb, 2),
-                'model_count': model_count,
+                'model_count': len(manifest['models']),
                 'base_dir': self.base_dir
             }
             
@@ -217,4 +726,4 @@ class ModelPersistence:
                 'model_count': 0,
                 'base_dir': self.base_dir,
                 'error': str(e)
-            }
\ No newline at end of file
+            }
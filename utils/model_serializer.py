@@ -0,0 +1,227 @@
+import os
+import time
+import pickle
+import importlib
+from utils.file_lock import atomic_write
+
+
+def _class_path(model):
+    model_class = type(model)
+    return f"{model_class.__module__}.{model_class.__qualname__}"
+
+
+def _import_class(class_path):
+    module_name, _, class_name = class_path.rpartition('.')
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+class _ByteCounter:
+    """File-like object yang hanya menghitung jumlah byte yang ditulis"""
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data):
+        size = memoryview(data).nbytes
+        self.size += size
+        return size
+
+
+def pickled_size(model):
+    """Ukuran model jika di-pickle biasa (bytes), tanpa menyimpan hasilnya di memori"""
+    counter = _ByteCounter()
+    try:
+        pickle.dump(model, counter, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        # Mis. model Keras yang tidak bisa di-pickle
+        return None
+    return counter.size
+
+
+def resolve_compression(compression):
+    """
+    Terjemahkan opsi kompresi menjadi argumen compress joblib
+
+    Args:
+        compression: None/False (tanpa kompresi), 'auto' (lz4 jika terpasang,
+            selain itu tanpa kompresi - zlib/lzma membuat load jauh lebih lambat),
+            nama compressor joblib ('lz4', 'zlib', 'lzma', ...) atau tuple (nama, level)
+
+    Returns:
+        Tuple (nama, level) atau None
+    """
+    if not compression:
+        return None
+    if compression == 'auto':
+        try:
+            import lz4  # noqa: F401
+            return ('lz4', 3)
+        except ImportError:
+            return None
+    if isinstance(compression, str):
+        return (compression, 3)
+    return tuple(compression)
+
+
+class ModelFormat:
+    """Format penyimpanan satu keluarga model (ekstensi file + fungsi save/load)"""
+
+    name = None
+    extension = None
+
+    def save(self, model, path):
+        raise NotImplementedError
+
+    def load(self, path, info):
+        raise NotImplementedError
+
+    def describe(self):
+        """Info tambahan format untuk metadata"""
+        return {}
+
+
+class PickleFormat(ModelFormat):
+    """Format lama (pickle.dump), hanya untuk membaca model yang sudah tersimpan"""
+
+    name = 'pickle'
+    extension = '.pkl'
+
+    def save(self, model, path):
+        with open(path, 'wb') as f:
+            pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def load(self, path, info):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+
+class JoblibFormat(ModelFormat):
+    """sklearn dan model lain: joblib (array numpy ditulis tanpa salinan), opsional dikompresi"""
+
+    name = 'joblib'
+    extension = '.joblib'
+
+    def __init__(self, compression=None):
+        self.compression = resolve_compression(compression)
+
+    def save(self, model, path):
+        import joblib
+        joblib.dump(model, path, compress=self.compression or 0)
+
+    def load(self, path, info):
+        import joblib
+        return joblib.load(path)
+
+    def describe(self):
+        return {'compression': list(self.compression) if self.compression else None}
+
+
+class CatBoostFormat(ModelFormat):
+    """CatBoost: format biner native .cbm"""
+
+    name = 'catboost'
+    extension = '.cbm'
+
+    def save(self, model, path):
+        model.save_model(path, format='cbm')
+
+    def load(self, path, info):
+        model = _import_class(info['class'])()
+        model.load_model(path, format='cbm')
+        return model
+
+
+class XGBoostFormat(ModelFormat):
+    """XGBoost: format UBJSON native (.ubj)"""
+
+    name = 'xgboost'
+    extension = '.ubj'
+
+    def save(self, model, path):
+        model.save_model(path)
+
+    def load(self, path, info):
+        model = _import_class(info['class'])()
+        model.load_model(path)
+        return model
+
+
+class KerasFormat(ModelFormat):
+    """Keras (LSTM): format .keras (arsitektur + bobot + state optimizer)"""
+
+    name = 'keras'
+    extension = '.keras'
+
+    def save(self, model, path):
+        model.save(path)
+
+    def load(self, path, info):
+        import keras
+        return keras.models.load_model(path)
+
+
+MODEL_FORMATS = {
+    fmt.name: fmt for fmt in [PickleFormat(), JoblibFormat(), CatBoostFormat(), XGBoostFormat(), KerasFormat()]
+}
+MODEL_EXTENSIONS = tuple(fmt.extension for fmt in MODEL_FORMATS.values())
+
+
+def detect_format(model, compression=None):
+    """Pilih format terbaik berdasarkan library asal object model"""
+    root_module = type(model).__module__.split('.')[0]
+    if root_module == 'catboost':
+        return MODEL_FORMATS['catboost']
+    if root_module == 'xgboost':
+        return MODEL_FORMATS['xgboost']
+    if root_module in ('keras', 'tf_keras', 'tensorflow'):
+        return MODEL_FORMATS['keras']
+    return JoblibFormat(compression)
+
+
+def save_model_file(model, path_stem, compression=None, verify=True):
+    """
+    Simpan object model dengan format native keluarganya
+
+    Args:
+        model: Object model yang sudah di-fit
+        path_stem: Path tanpa ekstensi (ekstensi ditentukan format)
+        compression: Opsi kompresi joblib (lihat resolve_compression)
+        verify: Muat ulang file sekali untuk memastikan round-trip dan mengukur waktu load
+
+    Returns:
+        Tuple (path, info) - info disimpan di metadata sebagai 'serialization'
+    """
+    fmt = detect_format(model, compression)
+    path = f"{path_stem}{fmt.extension}"
+
+    start = time.perf_counter()
+    # File sementara + rename: reader tidak pernah melihat file setengah tertulis
+    atomic_write(path, lambda tmp_path: fmt.save(model, tmp_path))
+    save_seconds = time.perf_counter() - start
+
+    file_size = os.path.getsize(path)
+    raw_size = pickled_size(model)
+    info = {
+        'format': fmt.name,
+        'file': os.path.basename(path),
+        'class': _class_path(model),
+        'size_bytes': file_size,
+        'pickle_size_bytes': raw_size,
+        'compression_ratio': round(raw_size / file_size, 3) if raw_size and file_size else None,
+        'save_seconds': round(save_seconds, 4),
+        'load_seconds': None,
+        **fmt.describe()
+    }
+
+    if verify:
+        start = time.perf_counter()
+        fmt.load(path, info)
+        info['load_seconds'] = round(time.perf_counter() - start, 4)
+
+    return path, info
+
+
+def load_model_file(path, info=None):
+    """Muat object model dari file; tanpa info (model lama) dianggap pickle"""
+    info = info or {'format': 'pickle'}
+    return MODEL_FORMATS[info['format']].load(path, info)
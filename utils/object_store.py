@@ -0,0 +1,96 @@
+import os
+import shutil
+import threading
+from utils.file_lock import FileLock
+from utils.model_manifest import file_checksum
+
+
+class ObjectStore:
+    """
+    Penyimpanan artefak berbasis isi (content-addressed).
+
+    Setiap file disimpan sekali di objects/<sha[:2]>/<sha><ext>; artefak
+    dengan isi identik (retrain yang sama, y_test yang sama) hanya memakan
+    ruang sekali. Publish dan garbage collection berjalan di bawah satu
+    lock store, sehingga GC tidak pernah menghapus blob yang baru saja
+    di-publish tetapi belum direferensikan versi mana pun.
+    """
+
+    def __init__(self, base_dir):
+        self.base_dir = base_dir
+        self.objects_dir = os.path.join(base_dir, "objects")
+        self.staging_dir = os.path.join(self.objects_dir, "staging")
+        os.makedirs(self.staging_dir, exist_ok=True)
+        self.lock = FileLock(os.path.join(base_dir, "locks", "objects.lock"))
+
+    def staging_path(self, name):
+        """Path sementara untuk menulis artefak sebelum di-publish"""
+        return os.path.join(self.staging_dir, f"{name}-{os.getpid()}-{threading.get_ident()}")
+
+    def relpath(self, digest, extension):
+        """Path blob relatif terhadap base_dir (dipakai di metadata dan manifest)"""
+        return f"objects/{digest[:2]}/{digest}{extension}"
+
+    def path(self, relpath):
+        return os.path.join(self.base_dir, relpath)
+
+    def put(self, staged_path, extension):
+        """
+        Pindahkan file staging ke store berdasarkan hash isinya
+
+        Harus dipanggil dengan self.lock dipegang (bersama penulisan versi).
+
+        Returns:
+            Tuple (relpath, size, sha256, is_new)
+        """
+        digest = file_checksum(staged_path)
+        relpath = self.relpath(digest, extension)
+        path = self.path(relpath)
+        size = os.path.getsize(staged_path)
+
+        if os.path.exists(path):
+            # Isi identik sudah ada: buang salinan baru
+            os.remove(staged_path)
+            return relpath, size, digest, False
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(staged_path, path)
+        return relpath, size, digest, True
+
+    def iter_objects(self):
+        """Yield (relpath, size) semua blob di store"""
+        if not os.path.isdir(self.objects_dir):
+            return
+        for prefix in sorted(os.listdir(self.objects_dir)):
+            prefix_dir = os.path.join(self.objects_dir, prefix)
+            if prefix == "staging" or not os.path.isdir(prefix_dir):
+                continue
+            for name in sorted(os.listdir(prefix_dir)):
+                yield f"objects/{prefix}/{name}", os.path.getsize(os.path.join(prefix_dir, name))
+
+    def collect_garbage(self, referenced):
+        """
+        Hapus blob yang tidak ada di referenced (set relpath)
+
+        Harus dipanggil dengan self.lock dipegang.
+
+        Returns:
+            List relpath yang dihapus
+        """
+        removed = []
+        for relpath, _ in list(self.iter_objects()):
+            if relpath not in referenced:
+                os.remove(self.path(relpath))
+                removed.append(relpath)
+        return removed
+
+    def clear_staging(self):
+        """Hapus sisa file staging milik proses ini (mis. setelah save gagal)"""
+        suffix = f"-{os.getpid()}-{threading.get_ident()}"
+        for name in os.listdir(self.staging_dir):
+            if suffix in name:
+                path = os.path.join(self.staging_dir, name)
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    os.remove(path)
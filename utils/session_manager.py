@@ -1,4 +1,9 @@
+import uuid
 import streamlit as st
+from utils.trained_model_store import TrainedModelStore, SESSION_MODEL_BUDGET_MB
+from utils.test_splits import test_splits
+from utils.model_persistence import LazyModelEntry
+from ml.training_jobs import TrainingJobManager, ACTIVE_STATUSES
 
 def init_session_state():
     """Initialize all session state variables"""
@@ -15,9 +20,12 @@ def init_session_state():
     if "model_params" not in st.session_state:
         st.session_state.model_params = {}
     
-    # Trained models storage
+    # Trained models storage (LRU dengan budget memori, model lama dilepas ke disk)
     if "trained_models" not in st.session_state:
-        st.session_state.trained_models = {}
+        st.session_state.trained_models = TrainedModelStore(
+            lambda: st.session_state.get("model_persistence"),
+            SESSION_MODEL_BUDGET_MB * 1024 * 1024
+        )
     
     # Data storage
     if "raw_data" not in st.session_state:
@@ -37,9 +45,22 @@ def init_session_state():
     
     if "selected_features" not in st.session_state:
         st.session_state.selected_features = []
+    
+    # Job training background milik sesi ini (job ID)
+    if "training_jobs" not in st.session_state:
+        st.session_state.training_jobs = []
+    
+    # ID sesi, pemilik job di antrian training (antrian adil antar sesi)
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
 
 def save_model_results(model_name, model, metrics, predictions):
     """Save trained model and its results to session state"""
+    if predictions.get("y_test") is not None:
+        # Model pada split yang sama berbagi satu array y_test
+        split_id, y_test = test_splits.share(predictions["y_test"], predictions.get("split_id"))
+        predictions = {**predictions, "y_test": y_test, "split_id": split_id}
+    
     st.session_state.trained_models[model_name] = {
         "model": model,
         "metrics": metrics,
@@ -53,8 +74,42 @@ def get_model_results(model_name):
 
 def clear_all_models():
     """Clear all trained models"""
-    st.session_state.trained_models = {}
+    st.session_state.trained_models.clear()
 
 def get_all_trained_models():
     """Get list of all trained model names"""
-    return list(st.session_state.trained_models.keys())
\ No newline at end of file
+    return list(st.session_state.trained_models.keys())
+
+@st.cache_resource
+def get_training_job_manager():
+    """Satu TrainingJobManager per proses server (job tetap berjalan walau sesi rerun)"""
+    return TrainingJobManager()
+
+def sync_training_jobs():
+    """
+    Masukkan hasil job training sesi ini yang sudah selesai ke trained_models
+    
+    Model yang berhasil didaftarkan sebagai LazyModelEntry (dibaca dari disk
+    saat dipakai). Job yang selesai dikeluarkan dari daftar job sesi.
+    
+    Returns:
+        List state job yang baru selesai
+    """
+    manager = get_training_job_manager()
+    finished = []
+    for job_id in list(st.session_state.training_jobs):
+        job = manager.get(job_id)
+        if job is not None and job['status'] in ACTIVE_STATUSES:
+            continue
+        
+        st.session_state.training_jobs.remove(job_id)
+        if job is None:
+            continue
+        
+        if job['status'] == 'done' and job.get('save_status'):
+            persistence = st.session_state.model_persistence
+            saved = {info['name']: info for info in persistence.list_saved_models()}
+            if job['save_name'] in saved:
+                st.session_state.trained_models[job['save_name']] = LazyModelEntry(persistence, saved[job['save_name']])
+        finished.append(job)
+    return finished
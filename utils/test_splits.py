@@ -0,0 +1,68 @@
+import hashlib
+import threading
+import weakref
+import numpy as np
+
+
+def compute_split_id(values):
+    """ID split test dari isi y_test (dtype + shape + bytes), stabil antar sesi dan restart"""
+    array = np.ascontiguousarray(np.asarray(values).ravel())
+    digest = hashlib.sha256()
+    digest.update(f"{array.dtype.str}:{array.shape}".encode('utf-8'))
+    digest.update(memoryview(array).cast('B'))
+    return digest.hexdigest()[:16]
+
+
+class TestSplitRegistry:
+    """
+    Satu array y_test per split, dipakai bersama oleh semua model.
+
+    Entry session (hasil training maupun LazyModelEntry dari disk) yang
+    dievaluasi pada split yang sama memegang object array yang sama,
+    sehingga model tambahan hanya menambah y_pred-nya sendiri. Array
+    disimpan sebagai weak reference: hilang otomatis saat tidak ada model
+    yang memakainya lagi.
+    """
+
+    def __init__(self):
+        self._arrays = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+
+    def share(self, values, split_id=None):
+        """
+        Daftarkan y_test dan kembalikan array bersama untuk split-nya
+
+        Returns:
+            Tuple (split_id, array read-only)
+        """
+        if split_id is None:
+            split_id = compute_split_id(values)
+
+        with self._lock:
+            array = self._arrays.get(split_id)
+            if array is None:
+                if isinstance(values, np.memmap):
+                    # Dicek sebelum np.asarray (yang mengubah memmap menjadi ndarray biasa):
+                    # array dari disk tetap di-map, tidak disalin ke heap
+                    array = values if values.ndim == 1 else values.reshape(-1)
+                else:
+                    # Salinan sendiri (bukan view Series milik sesi) dan read-only
+                    array = np.asarray(values).ravel().copy()
+                    array.flags.writeable = False
+                self._arrays[split_id] = array
+        return split_id, array
+
+    def load(self, split_id, loader):
+        """Ambil array split yang sudah terdaftar, atau muat dengan loader() dan daftarkan"""
+        with self._lock:
+            array = self._arrays.get(split_id)
+        if array is not None:
+            return array
+        return self.share(loader(), split_id=split_id)[1]
+
+    def __len__(self):
+        return len(self._arrays)
+
+
+# Registry bersama untuk seluruh proses server
+test_splits = TestSplitRegistry()
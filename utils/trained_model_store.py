@@ -0,0 +1,195 @@
+import os
+import weakref
+import threading
+import numpy as np
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from utils.model_persistence import LazyModelEntry
+from utils.model_serializer import pickled_size
+
+# Budget memori model per sesi (MB), bisa diatur lewat environment variable
+SESSION_MODEL_BUDGET_MB = int(os.environ.get("SESSION_MODEL_BUDGET_MB", "512"))
+
+
+def estimate_predictions_bytes(predictions):
+    """
+    Ukuran array predictions di memori
+
+    Array memory-mapped tidak dihitung; y_test bersama (ada split_id)
+    dihitung sekali per split oleh TrainedModelStore.
+    """
+    predictions = predictions or {}
+    total = 0
+    for key, value in predictions.items():
+        if isinstance(value, np.memmap) or (key == 'y_test' and predictions.get('split_id')):
+            continue
+        total += getattr(value, 'nbytes', 0)
+    return total
+
+
+def shared_split_usage(entry):
+    """(split_id, bytes) y_test bersama yang dipegang entry, atau None"""
+    if isinstance(entry, LazyModelEntry) and not entry.is_loaded('predictions'):
+        return None
+    predictions = entry.get('predictions') or {}
+    y_test = predictions.get('y_test')
+    if not predictions.get('split_id') or y_test is None or isinstance(y_test, np.memmap):
+        return None
+    return predictions['split_id'], getattr(y_test, 'nbytes', 0)
+
+
+def estimate_entry_bytes(entry):
+    """Estimasi ukuran satu entry trained_models di memori (bytes)"""
+    if isinstance(entry, LazyModelEntry):
+        size = entry.model_size_hint if entry.is_loaded('model') else 0
+        if entry.is_loaded('predictions'):
+            size += estimate_predictions_bytes(entry['predictions'])
+        return size
+
+    return (pickled_size(entry.get('model')) or 0) + estimate_predictions_bytes(entry.get('predictions'))
+
+
+class TrainedModelStore(MutableMapping):
+    """
+    Pengganti dictionary st.session_state.trained_models dengan budget memori.
+
+    Urutan entry mengikuti akses terakhir (LRU). Saat estimasi total ukuran
+    melewati budget, object model dan predictions dari entry yang paling
+    lama tidak dipakai dilepas: entry hasil training diganti LazyModelEntry
+    yang menunjuk ke versi di ModelPersistence, LazyModelEntry yang sudah
+    dimuat di-unload. Akses berikutnya memuat ulang dari disk secara
+    otomatis. Metrics dan params selalu tetap di memori. y_test bersama
+    (satu array per split) dihitung sekali, berapa pun model yang memakainya.
+    Semua akses dijaga satu RLock karena preload_models memuat entry dari
+    thread pool (hook on_load berjalan di thread worker).
+    """
+
+    def __init__(self, persistence_getter, budget_bytes):
+        """
+        Args:
+            persistence_getter: Fungsi tanpa argumen yang mengembalikan ModelPersistence (atau None)
+            budget_bytes: Budget total object model + predictions sesi ini
+        """
+        self._persistence_getter = persistence_getter
+        self.budget_bytes = budget_bytes
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._splits = {}
+        self.evictions = 0
+        self._lock = threading.RLock()
+
+    def __getitem__(self, name):
+        with self._lock:
+            entry = self._entries[name]
+            self._entries.move_to_end(name)
+            return entry
+
+    def __setitem__(self, name, entry):
+        with self._lock:
+            if isinstance(entry, LazyModelEntry):
+                # Hindari siklus referensi store <-> entry
+                entry.on_load = self._make_load_hook(name)
+            self._entries[name] = entry
+            self._entries.move_to_end(name)
+            self._account(name, entry)
+            self._evict_over_budget(protect=name)
+
+    def __delitem__(self, name):
+        with self._lock:
+            entry = self._entries.pop(name)
+            self._sizes.pop(name, None)
+            self._splits.pop(name, None)
+            if isinstance(entry, LazyModelEntry):
+                entry.on_load = None
+
+    def __iter__(self):
+        # Snapshot: akses (move_to_end) dan eviction selama iterasi tetap aman
+        with self._lock:
+            return iter(list(self._entries))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._splits.clear()
+
+    def _account(self, name, entry):
+        self._sizes[name] = estimate_entry_bytes(entry)
+        split = shared_split_usage(entry)
+        if split is None:
+            self._splits.pop(name, None)
+        else:
+            self._splits[name] = split
+
+    def _make_load_hook(self, name):
+        store_ref = weakref.ref(self)
+
+        def hook(entry):
+            store = store_ref()
+            if store is None:
+                return
+            with store._lock:
+                if store._entries.get(name) is entry:
+                    store._account(name, entry)
+                    store._entries.move_to_end(name)
+                    store._evict_over_budget(protect=name)
+        return hook
+
+    def used_bytes(self):
+        with self._lock:
+            shared = dict(self._splits.values())
+            return sum(self._sizes.values()) + sum(shared.values())
+
+    def _evict_over_budget(self, protect=None):
+        for name in list(self._entries):
+            if self.used_bytes() <= self.budget_bytes:
+                break
+            if name == protect or (self._sizes.get(name, 0) == 0 and name not in self._splits):
+                continue
+            if self._evict(name):
+                self._sizes[name] = 0
+                self._splits.pop(name, None)
+                self.evictions += 1
+
+    def _evict(self, name):
+        """Lepas bagian berat satu entry; False jika tidak bisa dimuat ulang dari disk"""
+        entry = self._entries[name]
+        if isinstance(entry, LazyModelEntry):
+            entry.unload()
+            return True
+
+        persistence = self._persistence_getter()
+        if persistence is None:
+            return False
+        metadata = persistence.load_metadata(name)
+        # Hanya jika versi di disk memang hasil training yang sama (save bisa gagal)
+        if metadata is None or metadata.get('metrics') != entry.get('metrics'):
+            return False
+
+        lazy_entry = LazyModelEntry(persistence, {
+            'name': name,
+            'metrics': metadata['metrics'],
+            'params': metadata.get('params', {}),
+            'saved_at': metadata.get('saved_at', 'Unknown'),
+            'serialization': metadata.get('serialization')
+        })
+        lazy_entry.on_load = self._make_load_hook(name)
+        self._entries[name] = lazy_entry
+        return True
+
+    def get_stats(self):
+        """Statistik pemakaian budget untuk ditampilkan di UI"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'in_memory': sum(1 for size in self._sizes.values() if size > 0),
+                'used_mb': round(self.used_bytes() / (1024 * 1024), 2),
+                'budget_mb': round(self.budget_bytes / (1024 * 1024), 2),
+                'evictions': self.evictions
+            }